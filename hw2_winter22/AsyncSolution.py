@@ -0,0 +1,488 @@
+import asyncio
+import contextvars
+from contextlib import asynccontextmanager
+from typing import List, Tuple
+
+import asyncpg
+
+import Solution
+from Solution import QueryResult, ProfileCache, _errorHandling, _sqlToMatch, _sqlToPlayer, _sqlToStadium
+import Utility.DBConnector as Connector
+from Utility.ReturnValue import ReturnValue
+from Utility.Exceptions import DatabaseException
+from Business.Match import Match
+from Business.Player import Player
+from Business.Stadium import Stadium
+
+'''
+    The Solution API for asyncio code, on top of asyncpg.
+    Every function has the same arguments and returns the same values as its Solution counterpart, and runs the
+    same queries (see Solution.defineStatements). Calls share a small pool of connections instead of holding one
+    each, so many concurrent tasks can be served by a few connections. asyncpg prepares the statements on each
+    connection once and reuses them.
+'''
+
+# region Utils
+_pool = None
+_poolLoop = None
+# the connection parameters the pool was opened with, schema included
+_poolParams = None
+_poolSettings = {"min_size": 1, "max_size": 10}
+
+# the connection of the transaction() scope open in this task, if any
+_active = contextvars.ContextVar("activeConnection", default=None)
+# profiles evicted and tables bumped by writes made in the transaction() scope open in this task
+_evicted = contextvars.ContextVar("evictedProfiles", default=None)
+_bumped = contextvars.ContextVar("bumpedTables", default=None)
+
+
+# change the pool settings (see asyncpg.create_pool for the accepted keywords), the current pool is closed
+async def configurePool(**settings):
+    _poolSettings.update(settings)
+    await closePool()
+
+
+async def getPool() -> asyncpg.Pool:
+    global _pool, _poolLoop, _poolParams
+    loop = asyncio.get_running_loop()
+    if _pool is not None and _poolLoop is not loop:
+        # a pool can only serve the loop that created it
+        _pool.terminate()
+        _pool = None
+    params = Connector.connectionParams()
+    if "port" in params:
+        params["port"] = int(params["port"])
+    if Connector.getSchema() is not None:
+        params["server_settings"] = {"search_path": Connector.getSchema()}
+    if _pool is not None and _poolParams != params:
+        # DBConnector.configureConnection / configureSchema changed where the connections go
+        await closePool()
+    if _pool is None:
+        _pool = await asyncpg.create_pool(**params, **_poolSettings)
+        _poolLoop = loop
+        _poolParams = params
+    return _pool
+
+
+# close the pool's connections, the next call opens a fresh pool
+async def closePool():
+    global _pool
+    pool, _pool = _pool, None
+    if pool is not None:
+        await pool.close()
+
+
+# the DatabaseException DBConnector would have raised for an asyncpg error
+def _translate(e: Exception) -> Exception:
+    if isinstance(e, asyncpg.PostgresError):
+        return Connector._databaseException(e.sqlstate, str(e))
+
+    error = DatabaseException.ConnectionInvalid(str(e))
+    error.pgcode = None
+    return error
+
+
+@asynccontextmanager
+async def _connection():
+    active = _active.get()
+    if active is not None:
+        yield active
+        return
+
+    pool = await getPool()
+    async with pool.acquire() as connection:
+        yield connection
+
+
+@asynccontextmanager
+async def transaction():
+    """
+    Like Solution.transaction(), for the calls awaited by this task. Each call still runs under its own savepoint.
+    Calls in the scope share one connection, so they must be awaited one at a time (no gather inside the scope).
+    """
+    active = _active.get()
+    if active is not None:
+        async with active.transaction():
+            yield
+        return
+
+    pool = await getPool()
+    async with pool.acquire() as connection:
+        connectionToken = _active.set(connection)
+        evictedToken = _evicted.set([])
+        bumpedToken = _bumped.set([])
+        try:
+            async with connection.transaction():
+                yield
+        finally:
+            evicted, bumped = _evicted.get(), _bumped.get()
+            _active.reset(connectionToken)
+            _evicted.reset(evictedToken)
+            _bumped.reset(bumpedToken)
+            # other tasks could have cached rows this transaction changed before it committed
+            for keys in evicted:
+                _evict(*keys)
+            for tables in bumped:
+                _bump(*tables)
+
+
+def _returnsRows(query) -> bool:
+    return query.split(None, 1)[0].upper() in ("SELECT", "WITH")
+
+
+async def _execute(connection, query, params):
+    if _returnsRows(query):
+        rows = await connection.fetch(query, *params)
+        return len(rows), rows
+
+    # the command tag, e.g. "DELETE 2"
+    status = await connection.execute(query, *params)
+    return int(status.rsplit(" ", 1)[-1]), None
+
+
+async def _send(run, isCrud: bool = False) -> QueryResult:
+    try:
+        async with _connection() as connection:
+            if connection.is_in_transaction():
+                async with connection.transaction():
+                    res = await run(connection)
+            else:
+                res = await run(connection)
+    except Exception as e:
+        return QueryResult(_errorHandling(_translate(e), isCrud), None, None)
+
+    return QueryResult(ReturnValue.OK, res[0], res[1])
+
+
+async def sendPrepared(name, params=(), isCrud: bool = False) -> QueryResult:
+    """
+    Runs a statement from Solution.Statements, Set is the list of asyncpg Records for queries returning rows.
+    """
+    if not Solution.Statements:
+        Solution.defineStatements()
+    statement = Solution.Statements[name]
+    query = statement["query"]
+    refresh = Solution._staleCandidates(statement)
+
+    async def run(connection):
+        if not refresh:
+            return await _execute(connection, query, params)
+        async with connection.transaction():
+            await connection.execute("SELECT refreshStaleViews($1)", refresh)
+            return await _execute(connection, query, params)
+
+    return await _send(run, isCrud)
+
+
+async def _sendBatch(query, rows, isCrud: bool = False) -> List[ReturnValue]:
+    """
+    Like Solution._sendBatch, query uses $n placeholders for a single row.
+    """
+    if not rows:
+        return []
+
+    async def run(connection):
+        async with connection.transaction():
+            try:
+                async with connection.transaction():
+                    await connection.executemany(query, rows)
+                return [ReturnValue.OK] * len(rows)
+            except Exception:
+                pass
+
+            results = []
+            for row in rows:
+                try:
+                    async with connection.transaction():
+                        await connection.execute(query, *row)
+                    results.append(ReturnValue.OK)
+                except Exception as e:
+                    results.append(_errorHandling(_translate(e), isCrud))
+            return results
+
+    try:
+        async with _connection() as connection:
+            return await run(connection)
+    except Exception:
+        return [ReturnValue.ERROR] * len(rows)
+
+
+def _evict(*keys):
+    # like Solution._evict, for this task's transaction() scope
+    if keys:
+        ProfileCache.invalidate(*keys)
+    else:
+        ProfileCache.clear()
+    evicted = _evicted.get()
+    if evicted is not None:
+        evicted.append(keys)
+
+
+def _bump(*tables):
+    # like Solution._bump, so Solution.ResultCache notices writes made through this module
+    Solution._bump(*tables)
+    bumped = _bumped.get()
+    if bumped is not None:
+        bumped.append(tables)
+
+
+async def _getProfile(name, key):
+    # like Solution._getProfile, rows are cached as tuples so both modules share ProfileCache
+    cacheable = _active.get() is None
+    if cacheable:
+        found, row = ProfileCache.get((name, key))
+        if found:
+            return row
+
+    generation = ProfileCache.generation
+    res = await sendPrepared(name, (key,))
+    if res.Status != ReturnValue.OK:
+        return None
+
+    row = tuple(res.Set[0]) if res.RowsAffected else None
+    if cacheable:
+        ProfileCache.put((name, key), row, generation)
+    return row
+
+
+async def _column(name, params=()) -> List[int]:
+    res = await sendPrepared(name, params)
+    if res.Status != ReturnValue.OK:
+        return []
+
+    return [row[0] for row in res.Set]
+# endregion
+
+# region Init
+# the schema is set up by Solution in a worker thread, the pooled connections are replaced afterwards so
+# none of them keeps state about the old tables
+async def _schemaChange(function):
+    await asyncio.to_thread(function)
+    _evict()
+    _bump()
+    if _pool is not None and _poolLoop is asyncio.get_running_loop():
+        await _pool.expire_connections()
+
+
+async def createTables():
+    await _schemaChange(Solution.createTables)
+
+
+async def clearTables():
+    await asyncio.to_thread(Solution.clearTables)
+
+
+async def dropTables():
+    await _schemaChange(Solution.dropTables)
+# endregion
+
+# region Team
+async def addTeam(teamID: int) -> ReturnValue:
+    res = await sendPrepared("addTeam", (teamID,), True)
+    _bump("Teams")
+    return res.Status
+# endregion
+
+# region Match
+async def addMatch(match: Match) -> ReturnValue:
+    params = (match.getMatchID(), match.getCompetition(), match.getHomeTeamID(), match.getAwayTeamID())
+    res = await sendPrepared("addMatch", params, True)
+    _evict(("getMatchProfile", match.getMatchID()))
+    _bump("Matches")
+    return res.Status
+
+
+async def getMatchProfile(matchID: int) -> Match:
+    row = await _getProfile("getMatchProfile", matchID)
+    if row is None:
+        return Match.badMatch()
+
+    return _sqlToMatch(row)
+
+
+async def deleteMatch(match: Match) -> ReturnValue:
+    res = await sendPrepared("deleteMatch", (match.getMatchID(),))
+    _evict(("getMatchProfile", match.getMatchID()))
+    _bump("Matches", "Scores", "MatchInStadium")
+    if res.Status == ReturnValue.OK and res.RowsAffected == 0:
+        return ReturnValue.NOT_EXISTS
+
+    return res.Status
+# endregion
+
+# region Player
+async def addPlayer(player: Player) -> ReturnValue:
+    params = (player.getPlayerID(), player.getTeamID(), player.getAge(), player.getHeight(), player.getFoot())
+    res = await sendPrepared("addPlayer", params, True)
+    _evict(("getPlayerProfile", player.getPlayerID()))
+    _bump("Players")
+    return res.Status
+
+
+async def getPlayerProfile(playerID: int) -> Player:
+    row = await _getProfile("getPlayerProfile", playerID)
+    if row is None:
+        return Player.badPlayer()
+
+    return _sqlToPlayer(row)
+
+
+async def deletePlayer(player: Player) -> ReturnValue:
+    res = await sendPrepared("deletePlayer", (player.getPlayerID(),))
+    _evict(("getPlayerProfile", player.getPlayerID()))
+    _bump("Players", "Scores")
+    if res.Status == ReturnValue.OK and res.RowsAffected == 0:
+        return ReturnValue.NOT_EXISTS
+
+    return res.Status
+# endregion
+
+# region Stadium
+async def addStadium(stadium: Stadium) -> ReturnValue:
+    params = (stadium.getStadiumID(), stadium.getCapacity(), stadium.getBelongsTo())
+    res = await sendPrepared("addStadium", params, True)
+    _evict(("getStadiumProfile", stadium.getStadiumID()))
+    _bump("Stadiums")
+    return res.Status
+
+
+async def getStadiumProfile(stadiumID: int) -> Stadium:
+    row = await _getProfile("getStadiumProfile", stadiumID)
+    if row is None:
+        return Stadium.badStadium()
+
+    return _sqlToStadium(row)
+
+
+async def deleteStadium(stadium: Stadium) -> ReturnValue:
+    res = await sendPrepared("deleteStadium", (stadium.getStadiumID(),))
+    _evict(("getStadiumProfile", stadium.getStadiumID()))
+    _bump("Stadiums")
+    if res.Status == ReturnValue.OK and res.RowsAffected == 0:
+        return ReturnValue.NOT_EXISTS
+
+    return res.Status
+# endregion
+
+# region Basic API
+async def playerScoredInMatch(match: Match, player: Player, amount: int) -> ReturnValue:
+    res = await sendPrepared("playerScoredInMatch", (player.getPlayerID(), match.getMatchID(), amount))
+    _bump("Scores")
+    return res.Status
+
+
+async def playerDidntScoreInMatch(match: Match, player: Player) -> ReturnValue:
+    res = await sendPrepared("playerDidntScoreInMatch", (match.getMatchID(), player.getPlayerID()))
+    _bump("Scores")
+    if res.Status == ReturnValue.OK and res.RowsAffected == 0:
+        return ReturnValue.NOT_EXISTS
+
+    return res.Status
+
+
+async def matchInStadium(match: Match, stadium: Stadium, attendance: int) -> ReturnValue:
+    res = await sendPrepared("matchInStadium", (match.getMatchID(), stadium.getStadiumID(), attendance))
+    _bump("MatchInStadium")
+    return res.Status
+
+
+async def matchNotInStadium(match: Match, stadium: Stadium) -> ReturnValue:
+    res = await sendPrepared("matchNotInStadium", (match.getMatchID(), stadium.getStadiumID()))
+    _bump("MatchInStadium")
+    if res.Status == ReturnValue.OK and res.RowsAffected == 0:
+        return ReturnValue.NOT_EXISTS
+
+    return res.Status
+
+
+async def averageAttendanceInStadium(stadiumID: int) -> float:
+    res = await sendPrepared("averageAttendanceInStadium", (stadiumID,))
+    if res.Status != ReturnValue.OK:
+        return -1
+
+    if res.RowsAffected == 0:
+        return 0
+
+    return res.Set[0][0]
+
+
+async def stadiumTotalGoals(stadiumID: int) -> int:
+    res = await sendPrepared("stadiumTotalGoals", (stadiumID,))
+    if res.Status != ReturnValue.OK:
+        return -1
+
+    if res.RowsAffected == 0:
+        return 0
+
+    return res.Set[0][0]
+
+
+async def playerIsWinner(playerID: int, matchID: int) -> bool:
+    res = await sendPrepared("playerIsWinner", (playerID, matchID))
+
+    if res.Status != ReturnValue.OK or res.RowsAffected < 2:
+        return False
+
+    playerAmount = res.Set[0][0]
+    totalAmount = res.Set[1][0]
+    return 2 * playerAmount >= totalAmount
+
+
+async def getActiveTallTeams() -> List[int]:
+    return await _column("getActiveTallTeams")
+
+
+async def getActiveTallRichTeams() -> List[int]:
+    return await _column("getActiveTallRichTeams")
+
+
+async def popularTeams() -> List[int]:
+    return await _column("popularTeams")
+# endregion
+
+# region Advanced API
+async def getMostAttractiveStadiums() -> List[int]:
+    return await _column("getMostAttractiveStadiums")
+
+
+async def mostGoalsForTeam(teamID: int) -> List[int]:
+    return await _column("mostGoalsForTeam", (teamID,))
+
+
+async def getClosePlayers(playerID: int) -> List[int]:
+    return await _column("getClosePlayers", (playerID,))
+# endregion
+
+# region Bulk API
+async def addTeams(teamIDs: List[int]) -> List[ReturnValue]:
+    results = await _sendBatch("INSERT INTO Teams (teamId) VALUES ($1)", [(teamID,) for teamID in teamIDs], True)
+    _bump("Teams")
+    return results
+
+
+async def addMatches(matches: List[Match]) -> List[ReturnValue]:
+    rows = [(match.getMatchID(), match.getCompetition(), match.getHomeTeamID(), match.getAwayTeamID())
+            for match in matches]
+    results = await _sendBatch("INSERT INTO Matches (matchId ,competition, homeTeamId, awayTeamId) "
+                               "VALUES ($1, $2, $3, $4)", rows, True)
+    _evict(*[("getMatchProfile", match.getMatchID()) for match in matches])
+    _bump("Matches")
+    return results
+
+
+async def addPlayers(players: List[Player]) -> List[ReturnValue]:
+    rows = [(player.getPlayerID(), player.getTeamID(), player.getAge(), player.getHeight(), player.getFoot())
+            for player in players]
+    results = await _sendBatch("INSERT INTO players (playerId, teamId, age, height, foot) "
+                               "VALUES ($1, $2, $3, $4, $5)", rows, True)
+    _evict(*[("getPlayerProfile", player.getPlayerID()) for player in players])
+    _bump("Players")
+    return results
+
+
+async def recordScores(scores: List[Tuple[Match, Player, int]]) -> List[ReturnValue]:
+    rows = [(player.getPlayerID(), match.getMatchID(), amount) for match, player, amount in scores]
+    results = await _sendBatch("INSERT INTO Scores (playerId, matchId, amount) VALUES ($1, $2, $3)", rows)
+    _bump("Scores")
+    return results
+# endregion
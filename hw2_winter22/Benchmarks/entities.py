@@ -0,0 +1,65 @@
+import time
+import tracemalloc
+
+import Utility.DBConnector as Connector
+from Benchmarks.resultSetRows import QUERY
+from Business.Player import Player
+
+'''
+    Memory per entity and row decoding time: the __dict__ based Player it was vs the __slots__ based one,
+    decoded row by row (the old _sqlToPlayer) vs Player.fromRows.
+    Run from the project root against a local database: python -m Benchmarks.entities
+'''
+
+
+# Player as it was before __slots__, getters left out
+class _LegacyPlayer:
+    def __init__(self, playerID=None, teamID=None, age=None, height=None, foot=None):
+        self.__playerID = playerID
+        self.__teamID = teamID
+        self.__age = age
+        self.__height = height
+        self.__foot = foot
+
+
+# what _sqlToPlayer did for each row
+def _legacyDecode(result):
+    return [_LegacyPlayer(playerID=row[0], teamID=row[1], age=row[2], height=row[3], foot=row[4])
+            for row in result.rows]
+
+
+def _slotsDecode(result):
+    return Player.fromRows(result)
+
+
+def _decodeTime(result, decode):
+    start = time.perf_counter()
+    decode(result)
+    return time.perf_counter() - start
+
+
+def _bytesPerEntity(result, decode):
+    tracemalloc.start()
+    players = decode(result)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    count = len(players)
+    del players
+    return size / count
+
+
+def main():
+    connector = Connector.DBConnector()
+    try:
+        _, result = connector.execute(QUERY)
+    finally:
+        connector.close()
+
+    print("%-10s %16s %18s" % ("entity", "decode (ms)", "bytes per entity"))
+    for name, decode in (("__dict__", _legacyDecode), ("__slots__", _slotsDecode)):
+        elapsed = min(_decodeTime(result, decode) for _ in range(3))
+        print("%-10s %16.1f %18.1f" % (name, elapsed * 1000, _bytesPerEntity(result, decode)))
+
+
+if __name__ == '__main__':
+    main()
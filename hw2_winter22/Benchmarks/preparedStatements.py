@@ -0,0 +1,79 @@
+import random
+import time
+
+from psycopg2 import sql
+
+import Solution
+import Utility.DBConnector as Connector
+from Benchmarks.suite import benchmarkSchema
+from Business.Match import Match
+from Business.Player import Player
+
+'''
+    Plain text queries vs server-side prepared statements, per call on one pooled connection.
+    Runs in a schema of its own (see suite.benchmarkSchema).
+    Run from the project root against a local database: python -m Benchmarks.preparedStatements
+'''
+
+ITERATIONS = 2000
+
+
+def _seed(teams=20, playersPerTeam=15, matches=200, scorersPerMatch=6):
+    for teamID in range(1, teams + 1):
+        Solution.addTeam(teamID)
+    players = []
+    for playerID in range(1, teams * playersPerTeam + 1):
+        player = Player(playerID, (playerID - 1) // playersPerTeam + 1, 25, random.randint(170, 200), "Left")
+        Solution.addPlayer(player)
+        players.append(player)
+    for matchID in range(1, matches + 1):
+        home, away = random.sample(range(1, teams + 1), 2)
+        match = Match(matchID, "Domestic", home, away)
+        Solution.addMatch(match)
+        for player in random.sample(players, scorersPerMatch):
+            Solution.playerScoredInMatch(match, player, random.randint(1, 3))
+
+
+# the text the Solution functions sent before they were prepared
+def _literalQuery(name, params):
+    query = Solution.Statements[name]["query"]
+    for index in reversed(range(len(params))):
+        query = query.replace("$" + str(index + 1), "{p" + str(index) + "}")
+    return sql.SQL(query).format(**{"p" + str(index): sql.Literal(value) for index, value in enumerate(params)})
+
+
+def _timeCalls(call, paramsList):
+    start = time.perf_counter()
+    for params in paramsList:
+        call(params)
+    return (time.perf_counter() - start) / len(paramsList) * 1e6
+
+
+def main():
+    random.seed(236363)
+    with benchmarkSchema():
+        _seed()
+        cases = {
+            "getPlayerProfile": [(random.randint(1, 300),) for _ in range(ITERATIONS)],
+            "playerIsWinner": [(random.randint(1, 300), random.randint(1, 200)) for _ in range(ITERATIONS)],
+            "getClosePlayers": [(random.randint(1, 300),) for _ in range(ITERATIONS // 10)],
+        }
+
+        connector = Connector.DBConnector()
+        try:
+            print("%-20s %14s %14s %8s" % ("statement", "text (us)", "prepared (us)", "saved"))
+            for name, paramsList in cases.items():
+                query = Solution.Statements[name]["query"]
+                # warm up both paths, the first EXECUTE also pays for the PREPARE
+                connector.execute(_literalQuery(name, paramsList[0]))
+                connector.executePrepared(name, query, paramsList[0])
+
+                text = _timeCalls(lambda params: connector.execute(_literalQuery(name, params)), paramsList)
+                prepared = _timeCalls(lambda params: connector.executePrepared(name, query, params), paramsList)
+                print("%-20s %14.1f %14.1f %7.1f%%" % (name, text, prepared, 100 * (text - prepared) / text))
+        finally:
+            connector.close()
+
+
+if __name__ == '__main__':
+    main()
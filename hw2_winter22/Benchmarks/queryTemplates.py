@@ -0,0 +1,73 @@
+import random
+import time
+
+import Solution
+import Utility.DBConnector as Connector
+from Benchmarks.preparedStatements import _literalQuery
+from Benchmarks.suite import benchmarkSchema
+from Business.Match import Match
+
+'''
+    Python-side cost per call: a query composed per call from sql.SQL / sql.Literal objects vs the statement
+    templates compiled once (Solution.Statements, executed by name with only the parameters bound).
+    Both are sent on the same pooled connection, only the statement text is built differently.
+    Measured as this process' CPU time, so the time spent waiting for the server is not counted.
+    Runs in a schema of its own (see suite.benchmarkSchema).
+    Run from the project root against a local database: python -m Benchmarks.queryTemplates
+'''
+
+ITERATIONS = 5000
+CHUNK = 500
+TEAMS = 20
+MATCHES = 500
+
+
+def _seed():
+    Solution.addTeams(list(range(1, TEAMS + 1)))
+    Solution.addMatches([Match(matchID, "Domestic", matchID % TEAMS + 1, (matchID + 1) % TEAMS + 1)
+                         for matchID in range(1, MATCHES + 1)])
+
+
+# the best mean over chunks of the calls, the server shares the CPUs and adds noise
+def _cpuPerCall(call, argsList):
+    best = None
+    for start in range(0, len(argsList), CHUNK):
+        chunk = argsList[start:start + CHUNK]
+        started = time.process_time()
+        for args in chunk:
+            call(*args)
+        cost = (time.process_time() - started) / len(chunk) * 1e6
+        best = cost if best is None else min(best, cost)
+    return best
+
+
+def main():
+    rnd = random.Random(236363)
+    with benchmarkSchema():
+        _seed()
+        # every path gets its own players and scores, the writes must not collide
+        players = [[(playerID, rnd.randint(1, TEAMS), 25, 185, "Left")
+                    for playerID in range(offset + 1, offset + ITERATIONS + 1)] for offset in (0, ITERATIONS)]
+        scores = [[(player[0], rnd.randint(1, MATCHES), 1) for player in share] for share in players]
+        closePlayers = [(rnd.randint(1, 2 * ITERATIONS),) for _ in range(ITERATIONS)]
+        # the arguments of the Solution statements, for the composed path and for the template path
+        cases = [("addPlayer", players), ("playerScoredInMatch", scores),
+                 ("getClosePlayers", [closePlayers, closePlayers])]
+
+        connector = Connector.DBConnector()
+        try:
+            print("%-22s %14s %14s %8s" % ("function", "composed (us)", "template (us)", "saved"))
+            for name, (composedArgs, templateArgs) in cases:
+                query = Solution.Statements[name]["query"]
+                composedCost = _cpuPerCall(lambda *params: connector.execute(_literalQuery(name, params)),
+                                           composedArgs)
+                templateCost = _cpuPerCall(lambda *params: connector.executePrepared(name, query, params),
+                                           templateArgs)
+                print("%-22s %14.1f %14.1f %7.1f%%" % (name, composedCost, templateCost,
+                                                      100 * (composedCost - templateCost) / composedCost))
+        finally:
+            connector.close()
+
+
+if __name__ == '__main__':
+    main()
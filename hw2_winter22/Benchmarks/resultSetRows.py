@@ -0,0 +1,62 @@
+import time
+import tracemalloc
+
+import Utility.DBConnector as Connector
+from Utility.DBConnector import ResultSetDict
+
+'''
+    Per-access ResultSetDict rows (the old ResultSet[index]) vs tuple-backed Row views.
+    Run from the project root against a local database: python -m Benchmarks.resultSetRows
+'''
+
+ROWS = 200000
+QUERY = ("SELECT n AS playerId, n % 50 AS teamId, 20 + n % 15 AS age, 170 + n % 40 AS height, "
+         "CASE WHEN n % 2 = 0 THEN 'Left' ELSE 'Right' END AS foot FROM generate_series(1, " + str(ROWS) + ") n")
+
+
+# what ResultSet.__getRow built before rows became views
+def _legacyRow(result, index):
+    row = ResultSetDict()
+    for val, col in zip(result.rows[index], result.cols_header):
+        row[col] = val
+    return row
+
+
+def _rowRow(result, index):
+    return result[index]
+
+
+def _iterate(result, getRow):
+    start = time.perf_counter()
+    total = 0
+    for index in range(result.size()):
+        row = getRow(result, index)
+        total += row["height"] + row["AGE"]
+    return time.perf_counter() - start
+
+
+def _holdAll(result, getRow):
+    tracemalloc.start()
+    rows = [getRow(result, index) for index in range(result.size())]
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del rows
+    return size
+
+
+def main():
+    connector = Connector.DBConnector()
+    try:
+        _, result = connector.execute(QUERY)
+    finally:
+        connector.close()
+
+    print("%-14s %16s %20s" % ("row type", "iterate (ms)", "hold all rows (MB)"))
+    for name, getRow in (("ResultSetDict", _legacyRow), ("Row", _rowRow)):
+        elapsed = min(_iterate(result, getRow) for _ in range(3))
+        size = _holdAll(result, getRow)
+        print("%-14s %16.1f %20.1f" % (name, elapsed * 1000, size / 2 ** 20))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,263 @@
+import argparse
+import json
+import platform
+import random
+import subprocess
+import time
+from contextlib import contextmanager
+
+import Solution
+import Utility.DBConnector as Connector
+from Business.Match import Match
+from Business.Player import Player
+from Business.Stadium import Stadium
+
+'''
+    Latency and throughput of every Solution API function on a seeded league.
+    Run from the project root against a local database, e.g.:
+        python -m Benchmarks.suite --scale medium --output benchmark.json
+        python -m Benchmarks.suite --scale small --compare benchmark.json
+
+    Every function is measured cold (first call after the connection pool, the profile cache and the result cache
+    were reset, so it pays for connecting, preparing and running the query) and warm (the calls after that). Postgres' own buffers are not flushed.
+    The read functions are also measured uncached: the warm calls again, with the caches cleared before each, so
+    the query itself is timed even for the functions served from ResultCache.
+    Everything runs in a schema of its own (see benchmarkSchema), the tables of the configured one are not touched.
+'''
+
+SCALES = {
+    # scores = matches * scorersPerMatch
+    "small": {"teams": 20, "playersPerTeam": 15, "matches": 200, "scorersPerMatch": 5},
+    "medium": {"teams": 200, "playersPerTeam": 25, "matches": 10000, "scorersPerMatch": 10},
+    "large": {"teams": 1000, "playersPerTeam": 25, "matches": 100000, "scorersPerMatch": 10},
+}
+
+SEED_CHUNK = 10000
+SCHEMA = "benchmark"
+
+
+@contextmanager
+def benchmarkSchema(schema=SCHEMA):
+    """
+    Runs the scope against fresh tables in the given schema, dropped at the end; the configured schema is restored.
+    """
+    previous = Connector.getSchema()
+    Connector.configureSchema(schema)
+    try:
+        # whatever an interrupted run left behind
+        Solution.sendQuery("DROP SCHEMA IF EXISTS " + schema + " CASCADE")
+        Solution.createTables()
+        yield
+    finally:
+        Solution.sendQuery("DROP SCHEMA IF EXISTS " + schema + " CASCADE")
+        Connector.configureSchema(previous)
+        # the caches hold rows of the benchmark's tables
+        Solution._evict()
+        Solution._bump()
+
+
+def _timed(function, *args):
+    start = time.perf_counter()
+    function(*args)
+    return time.perf_counter() - start
+
+
+def _seedChunks(function, rows):
+    seconds = 0.0
+    for start in range(0, len(rows), SEED_CHUNK):
+        seconds += _timed(function, rows[start:start + SEED_CHUNK])
+    return {"rows": len(rows), "seconds": seconds, "rowsPerSecond": len(rows) / seconds if seconds else None}
+
+
+def seed(rnd, teams, playersPerTeam, matches, scorersPerMatch) -> dict:
+    """
+    Fills the tables through the bulk API: every team has a stadium, players are split evenly between teams,
+    each match is played in a stadium (90% of them) and scorersPerMatch players of both teams scored in it.
+    :return: the seeding time of each bulk call
+    """
+    players = [Player(playerID, (playerID - 1) // playersPerTeam + 1, rnd.randint(18, 35), rnd.randint(170, 205),
+                      rnd.choice(("Left", "Right"))) for playerID in range(1, teams * playersPerTeam + 1)]
+    fixtures = []
+    for matchID in range(1, matches + 1):
+        home, away = rnd.sample(range(1, teams + 1), 2)
+        fixtures.append(Match(matchID, rnd.choice(("Domestic", "International")), home, away))
+
+    scores = []
+    for match in fixtures:
+        squad = [playerID for team in (match.getHomeTeamID(), match.getAwayTeamID())
+                 for playerID in range((team - 1) * playersPerTeam + 1, team * playersPerTeam + 1)]
+        for playerID in rnd.sample(squad, min(scorersPerMatch, len(squad))):
+            scores.append((match, Player(playerID), rnd.randint(1, 3)))
+
+    timings = {"addTeams": _seedChunks(Solution.addTeams, list(range(1, teams + 1))),
+               "addPlayers": _seedChunks(Solution.addPlayers, players),
+               "addMatches": _seedChunks(Solution.addMatches, fixtures),
+               "recordScores": _seedChunks(Solution.recordScores, scores)}
+
+    start = time.perf_counter()
+    with Solution.transaction():
+        for teamID in range(1, teams + 1):
+            Solution.addStadium(Stadium(teamID, rnd.randint(20000, 80000), teamID))
+        for match in fixtures:
+            if rnd.random() < 0.9:
+                Solution.matchInStadium(match, Stadium(rnd.randint(1, teams)), rnd.randint(5000, 80000))
+    timings["stadiums"] = {"rows": teams + matches, "seconds": time.perf_counter() - start}
+    return timings
+
+
+def _summary(samples) -> dict:
+    if not samples:
+        return {"count": 0}
+    ordered = sorted(samples)
+
+    def percentile(p):
+        return ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))] * 1000
+
+    total = sum(ordered)
+    return {"count": len(ordered), "meanMs": total / len(ordered) * 1000, "p50Ms": percentile(50),
+            "p90Ms": percentile(90), "p99Ms": percentile(99), "maxMs": ordered[-1] * 1000,
+            "callsPerSecond": len(ordered) / total if total else None}
+
+
+def _uncached(call):
+    Solution.ProfileCache.clear()
+    Solution.ResultCache.clear()
+    return _timed(call)
+
+
+def measure(calls, coldRuns, repeatable=False) -> dict:
+    """
+    :param calls: zero-argument callables, the first coldRuns of them are timed cold
+    :param repeatable: the calls may run twice (reads), the warm ones are then also timed uncached
+    """
+    cold = []
+    for call in calls[:coldRuns]:
+        Connector.closePool()
+        cold.append(_uncached(call))
+    warm = [_timed(call) for call in calls[coldRuns:]]
+    timings = {"cold": _summary(cold), "warm": _summary(warm)}
+    if repeatable:
+        timings["uncached"] = _summary([_uncached(call) for call in calls[coldRuns:]])
+    return timings
+
+
+def readCalls(rnd, teams, playersPerTeam, matches, count) -> dict:
+    players, stadiums = teams * playersPerTeam, teams
+
+    def calls(function, *ranges):
+        return [lambda args=tuple(rnd.randint(1, bound) for bound in ranges): function(*args) for _ in range(count)]
+
+    return {
+        "getMatchProfile": calls(Solution.getMatchProfile, matches),
+        "getPlayerProfile": calls(Solution.getPlayerProfile, players),
+        "getStadiumProfile": calls(Solution.getStadiumProfile, stadiums),
+        "averageAttendanceInStadium": calls(Solution.averageAttendanceInStadium, stadiums),
+        "stadiumTotalGoals": calls(Solution.stadiumTotalGoals, stadiums),
+        "playerIsWinner": calls(Solution.playerIsWinner, players, matches),
+        "getActiveTallTeams": calls(Solution.getActiveTallTeams),
+        "getActiveTallRichTeams": calls(Solution.getActiveTallRichTeams),
+        "popularTeams": calls(Solution.popularTeams),
+        "getMostAttractiveStadiums": calls(Solution.getMostAttractiveStadiums),
+        "mostGoalsForTeam": calls(Solution.mostGoalsForTeam, teams),
+        "getClosePlayers": calls(Solution.getClosePlayers, players),
+    }
+
+
+def writeCalls(teams, playersPerTeam, matches, count) -> dict:
+    """
+    Adds count new teams, players, matches and stadiums, links them and removes them again, in this order.
+    The new teams stay since the API cannot delete teams.
+    """
+    newTeams = range(teams + 1, teams + count + 1)
+    newPlayers = [Player(teams * playersPerTeam + i, team, 25, 190, "Left") for i, team in enumerate(newTeams, 1)]
+    newMatches = [Match(matches + i, "Domestic", team, team % teams + 1) for i, team in enumerate(newTeams, 1)]
+    newStadiums = [Stadium(teams + i, 50000, team) for i, team in enumerate(newTeams, 1)]
+    linked = list(zip(newPlayers, newMatches, newStadiums))
+
+    return {
+        "addTeam": [lambda team=team: Solution.addTeam(team) for team in newTeams],
+        "addPlayer": [lambda player=player: Solution.addPlayer(player) for player in newPlayers],
+        "addMatch": [lambda match=match: Solution.addMatch(match) for match in newMatches],
+        "addStadium": [lambda stadium=stadium: Solution.addStadium(stadium) for stadium in newStadiums],
+        "playerScoredInMatch": [lambda p=p, m=m: Solution.playerScoredInMatch(m, p, 2) for p, m, s in linked],
+        "matchInStadium": [lambda m=m, s=s: Solution.matchInStadium(m, s, 30000) for p, m, s in linked],
+        "matchNotInStadium": [lambda m=m, s=s: Solution.matchNotInStadium(m, s) for p, m, s in linked],
+        "playerDidntScoreInMatch": [lambda p=p, m=m: Solution.playerDidntScoreInMatch(m, p) for p, m, s in linked],
+        "deleteStadium": [lambda stadium=stadium: Solution.deleteStadium(stadium) for stadium in newStadiums],
+        "deleteMatch": [lambda match=match: Solution.deleteMatch(match) for match in newMatches],
+        "deletePlayer": [lambda player=player: Solution.deletePlayer(player) for player in newPlayers],
+    }
+
+
+def _commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(scale, iterations, coldRuns, seedValue=236363) -> dict:
+    rnd = random.Random(seedValue)
+    with benchmarkSchema():
+        seeding = seed(rnd, **scale)
+        reads = readCalls(rnd, scale["teams"], scale["playersPerTeam"], scale["matches"], coldRuns + iterations)
+        writes = writeCalls(scale["teams"], scale["playersPerTeam"], scale["matches"], coldRuns + iterations)
+
+        functions = {}
+        for name, calls in list(reads.items()) + list(writes.items()):
+            functions[name] = measure(calls, coldRuns, repeatable=name in reads)
+            line = "%-28s cold %9.2f ms   warm p50 %8.3f ms   p99 %8.3f ms" % (
+                name, functions[name]["cold"]["p50Ms"], functions[name]["warm"]["p50Ms"],
+                functions[name]["warm"]["p99Ms"])
+            if "uncached" in functions[name]:
+                line += "   uncached p50 %8.3f ms" % functions[name]["uncached"]["p50Ms"]
+            print(line)
+
+    return {"commit": _commit(), "timestamp": time.time(), "python": platform.python_version(),
+            "materializeViews": Solution.MaterializeViews, "scale": scale, "scores": scale["matches"] * scale["scorersPerMatch"],
+            "iterations": iterations, "coldRuns": coldRuns, "seed": seeding, "functions": functions}
+
+
+# warm and uncached p50s of this run against an earlier JSON result, > 1 means slower now
+def compare(result, baseline):
+    print("%-28s %-9s %12s %12s %8s" % ("function", "series", "before (ms)", "now (ms)", "ratio"))
+    for name, timings in result["functions"].items():
+        for series in ("warm", "uncached"):
+            before = baseline.get("functions", {}).get(name, {}).get(series, {}).get("p50Ms")
+            now = timings.get(series, {}).get("p50Ms")
+            if before and now is not None:
+                print("%-28s %-9s %12.3f %12.3f %8.2f" % (name, series, before, now, now / before))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--scale", choices=SCALES, default="small")
+    for key in SCALES["small"]:
+        parser.add_argument("--" + key, type=int, help="override the scale's " + key)
+    parser.add_argument("--iterations", type=int, default=200, help="warm calls per function")
+    parser.add_argument("--coldRuns", type=int, default=3, help="cold calls per function")
+    parser.add_argument("--materialize", action="store_true", help="run with Solution.MaterializeViews")
+    parser.add_argument("--output", default=None, help="JSON file, defaults to benchmark-<scale>.json")
+    parser.add_argument("--compare", default=None, help="an earlier JSON result to compare warm and uncached p50s against")
+    args = parser.parse_args()
+
+    scale = dict(SCALES[args.scale])
+    for key in scale:
+        if getattr(args, key) is not None:
+            scale[key] = getattr(args, key)
+    Solution.MaterializeViews = args.materialize
+
+    result = run(scale, args.iterations, args.coldRuns)
+    output = args.output or "benchmark-" + args.scale + ".json"
+    with open(output, "w") as file:
+        json.dump(result, file, indent=2)
+    print("written to " + output)
+
+    if args.compare:
+        with open(args.compare) as file:
+            compare(result, json.load(file))
+
+
+if __name__ == '__main__':
+    main()
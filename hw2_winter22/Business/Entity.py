@@ -0,0 +1,36 @@
+import functools
+import itertools
+
+
+# the (name, stored attribute) of every field, in constructor order: "__playerID" is stored as _Player__playerID
+@functools.lru_cache(maxsize=None)
+def _fields(cls) -> tuple:
+    return tuple((name[2:], "_" + klass.__name__.lstrip("_") + name)
+                 for klass in reversed(cls.__mro__) for name in klass.__dict__.get("__slots__", ()))
+
+
+# base of the business entities, which list their fields in __slots__ in the column order of their table
+# (no per-object __dict__, rosters of whole leagues are held in memory)
+# equal and hashed by all fields; don't change an entity while it is in a set or a dict
+class Entity:
+    __slots__ = ()
+
+    # one entity per row: the rows of a ResultSet, or any row tuples in the column order of the entity's table
+    @classmethod
+    def fromRows(cls, rows) -> list:
+        return list(itertools.starmap(cls, getattr(rows, "rows", rows)))
+
+    def _values(self) -> tuple:
+        return tuple(getattr(self, attribute) for _, attribute in _fields(type(self)))
+
+    def __eq__(self, other):
+        if type(other) is not type(self):
+            return NotImplemented
+        return self._values() == other._values()
+
+    def __hash__(self):
+        return hash(self._values())
+
+    def __repr__(self):
+        return type(self).__name__ + "(" + ", ".join(name + "=" + repr(getattr(self, attribute))
+                                                     for name, attribute in _fields(type(self))) + ")"
@@ -1,4 +1,9 @@
-class Match:
+from Business.Entity import Entity
+
+
+class Match(Entity):
+    __slots__ = ("__matchID", "__competition", "__homeTeamID", "__awayTeamID")
+
     def __init__(self, matchID=None, competition=None, homeTeamID=None, awayTeamID=None):
         self.__matchID = matchID
         self.__competition = competition
@@ -34,5 +39,5 @@ class Match:
         return Match()
 
     def __str__(self):
-        print("MatchID=" + str(self.__matchID) + ", competition=" + str(self.__competition) + ", home team=" + str(
-            self.__homeTeamID) + ", away team=" + str(self.__awayTeamID))
+        return "MatchID=" + str(self.__matchID) + ", competition=" + str(self.__competition) + ", home team=" + str(
+            self.__homeTeamID) + ", away team=" + str(self.__awayTeamID)
@@ -1,4 +1,9 @@
-class Player:
+from Business.Entity import Entity
+
+
+class Player(Entity):
+    __slots__ = ("__playerID", "__teamID", "__age", "__height", "__foot")
+
     def __init__(self, playerID=None, teamID=None, age=None, height=None, foot=None):
         self.__playerID = playerID
         self.__teamID = teamID
@@ -41,5 +46,5 @@ class Player:
         return Player()
 
     def __str__(self):
-        print("PlayerID=" + str(self.__playerID) + ", TeamID=" + str(self.__teamID) + ", age=" + str(self.__age)
-              + ", height=" + str(self.__height) + ", foot=" + str(self.__foot))
+        return "PlayerID=" + str(self.__playerID) + ", TeamID=" + str(self.__teamID) + ", age=" + str(self.__age) \
+            + ", height=" + str(self.__height) + ", foot=" + str(self.__foot)
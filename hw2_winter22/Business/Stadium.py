@@ -1,4 +1,9 @@
-class Stadium:
+from Business.Entity import Entity
+
+
+class Stadium(Entity):
+    __slots__ = ("__stadiumID", "__capacity", "__belongsTo")
+
     def __init__(self, stadiumID=None, capacity=None, belongsTo=None):
         self.__stadiumID = stadiumID
         self.__capacity = capacity
@@ -27,5 +32,5 @@ class Stadium:
         return Stadium()
 
     def __str__(self):
-        print("stadiumID=" + str(self.__stadiumID) + ", capacity=" + str(self.__capacity) + ", belongs to=" + str(
-            self.__belongsTo))
+        return "stadiumID=" + str(self.__stadiumID) + ", capacity=" + str(self.__capacity) + ", belongs to=" + str(
+            self.__belongsTo)
@@ -1,9 +1,16 @@
 import collections
-from typing import List
+import hashlib
+import itertools
+import threading
+import uuid
+from contextlib import contextmanager
+from typing import List, Tuple
 
 from pycparser.c_ast import Return
 
+import psycopg2
 import Utility.DBConnector as Connector
+from Utility.Cache import LRUCache
 from Utility.ReturnValue import ReturnValue
 from Utility.Exceptions import DatabaseException
 from Business.Match import Match
@@ -14,6 +21,23 @@ from psycopg2 import sql
 # region Utils
 Tables = []
 Views = []
+Triggers = []
+Statements = {}
+
+# opt-in: create the analytic views as materialized views, refreshed on read once a write made them stale
+MaterializeViews = False
+
+# the connector of the transaction() scope open in this thread, if any
+_local = threading.local()
+
+# profile rows by (statement name, id), None for ids with no row, see _getProfile
+ProfileCache = LRUCache(maxSize=4096)
+
+# results of statements declared with tables, by (statement name, params, versions of those tables), see _getCached
+ResultCache = LRUCache(maxSize=1024)
+# table name -> version, bumped by the write functions after they wrote the table, see _bump
+_tableVersions = collections.defaultdict(int)
+_versionClock = itertools.count(1)
 
 
 def _errorHandling(e, isCrud: bool = False) -> ReturnValue:
@@ -36,22 +60,242 @@ def _errorHandling(e, isCrud: bool = False) -> ReturnValue:
     return ReturnValue.ERROR
 
 
-def sendQuery(query, isCrud: bool = False) -> collections.namedtuple("QueryResult", ["Status", "RowsAffected","Set"]):
+QueryResult = collections.namedtuple("QueryResult", ["Status", "RowsAffected", "Set"])
+
+
+def _activeConnector():
+    return getattr(_local, "connector", None)
+
+
+@contextmanager
+def transaction():
+    """
+    Groups every Solution call made inside the scope (in this thread) into one transaction with one commit.
+    Each call still runs under its own savepoint, so a failing call returns its usual ReturnValue and
+    the other calls are kept. An exception escaping the scope rolls back everything. Scopes may be nested.
+    """
+    active = _activeConnector()
+    if active is not None:
+        with active.transaction():
+            yield
+        return
+
     dbConnector = Connector.DBConnector()
+    _local.connector = dbConnector
+    _local.evicted = []
+    _local.bumped = []
+    try:
+        with dbConnector.transaction():
+            yield
+    finally:
+        _local.connector = None
+        dbConnector.close()
+        # other threads could have cached rows this transaction changed before it committed
+        for keys in _local.evicted:
+            _evict(*keys)
+        for tables in _local.bumped:
+            _bump(*tables)
+
+
+# raised at the end of a rolledBack() scope to roll its transaction back
+class _RollBack(Exception):
+    pass
+
+
+@contextmanager
+def rolledBack():
+    """
+    Like transaction(), but the scope never commits: everything done in it is rolled back when it ends.
+    Lets tests undo their writes without clearing the tables.
+    """
+    try:
+        with transaction():
+            yield
+            raise _RollBack()
+    except _RollBack:
+        pass
+
+
+def _send(run, isCrud: bool = False) -> QueryResult:
+    active = _activeConnector()
+    dbConnector = active if active is not None else Connector.DBConnector()
     retValue = ReturnValue.OK
     res = None
     try:
-        res = dbConnector.execute(query=query)
+        with dbConnector.transaction():
+            res = run(dbConnector)
     except BaseException as e:
         retValue = _errorHandling(e, isCrud)
     finally:
-        dbConnector.close()
+        if active is None:
+            dbConnector.close()
+
+    return QueryResult(retValue, None if res is None else res[0], None if res is None else res[1])
+
+
+def sendQuery(query, isCrud: bool = False) -> QueryResult:
+    return _send(lambda dbConnector: dbConnector.execute(query=query), isCrud)
+
+
+def sendQueries(queries, isCrud: bool = False, atomic: bool = False) -> List[QueryResult]:
+    """
+    Sends all queries in a single round trip, see DBConnector.executeMany.
+    :param atomic: stop at the first failing query and undo the others, instead of keeping the ones that succeed
+    :return: a QueryResult per query (Set is always None), all with the same Status if the round trip failed
+    """
+    if not queries:
+        return []
+
+    active = _activeConnector()
+    dbConnector = active if active is not None else Connector.DBConnector()
+    try:
+        with dbConnector.transaction():
+            results = dbConnector.executeMany(queries, atomic)
+    except BaseException as e:
+        return [QueryResult(_errorHandling(e, isCrud), None, None)] * len(queries)
+    finally:
+        if active is None:
+            dbConnector.close()
+
+    return [QueryResult(ReturnValue.OK if error is None else _errorHandling(error, isCrud), rowCount, None)
+            for rowCount, error in results]
+
+
+def sendPrepared(name, params=(), isCrud: bool = False) -> QueryResult:
+    """
+    Runs a statement from the Statements registry as a server-side prepared statement.
+    :param name: The statement name, see defineStatements
+    :param params: values for the statement's $1, $2, ... placeholders
+    """
+    if not Statements:
+        defineStatements()
+    statement = Statements[name]
+    query = statement["query"]
+    refresh = _staleCandidates(statement)
+
+    def run(dbConnector):
+        if refresh:
+            dbConnector.executePrepared("refreshStaleViews", "SELECT refreshStaleViews($1)", (refresh,))
+        return dbConnector.executePrepared(name, query, params)
+
+    return _send(run, isCrud)
+
+
+def _sendBatch(query, rows, isCrud: bool = False) -> List[ReturnValue]:
+    """
+    Inserts all rows in a single transaction. One multi-row INSERT is tried first; if it fails, the rows are
+    inserted one by one, each under its own savepoint, so a bad row fails alone and the others are kept.
+    :param query: an INSERT ... VALUES %s query
+    :param rows: a list of parameter tuples, one per row
+    :return: a ReturnValue per row, the same one the single row function would have returned
+    """
+    if not rows:
+        return []
+
+    active = _activeConnector()
+    dbConnector = active if active is not None else Connector.DBConnector()
+    try:
+        with dbConnector.transaction():
+            try:
+                with dbConnector.transaction():
+                    dbConnector.executeValues(query, rows)
+                return [ReturnValue.OK] * len(rows)
+            except BaseException:
+                pass
+
+            results = []
+            for row in rows:
+                try:
+                    with dbConnector.transaction():
+                        dbConnector.executeValues(query, [row])
+                    results.append(ReturnValue.OK)
+                except BaseException as e:
+                    results.append(_errorHandling(e, isCrud))
+            return results
+    except BaseException:
+        return [ReturnValue.ERROR] * len(rows)
+    finally:
+        if active is None:
+            dbConnector.close()
+
+
+def _evict(*keys):
+    """
+    Drops cached profiles, now and again when the enclosing transaction() scope ends.
+    :param keys: (statement name, id) pairs, none drops every profile
+    """
+    if keys:
+        ProfileCache.invalidate(*keys)
+    else:
+        ProfileCache.clear()
+    if _activeConnector() is not None:
+        _local.evicted.append(keys)
 
-    queryResult = collections.namedtuple("QueryResult", ["Status","RowsAffected", "Set"])
-    return queryResult(retValue, None if res is None else res[0], None if res is None else res[1])
+
+def _getProfile(name, key):
+    """
+    Runs a profile statement through ProfileCache. Calls inside a transaction() scope skip the cache,
+    they may see rows that were not committed yet.
+    :return: the row for key, None if there is none or the query failed
+    """
+    cacheable = _activeConnector() is None
+    if cacheable:
+        found, row = ProfileCache.get((name, key))
+        if found:
+            return row
+
+    generation = ProfileCache.generation
+    res = sendPrepared(name, (key,))
+    if res.Status != ReturnValue.OK:
+        return None
+
+    row = res.Set.rows[0] if res.RowsAffected else None
+    if cacheable:
+        ProfileCache.put((name, key), row, generation)
+    return row
+
+
+def _bump(*tables):
+    """
+    Gives the tables new versions, now and again when the enclosing transaction() scope ends,
+    so results cached in ResultCache from their old contents are not used anymore.
+    :param tables: table names as in Tables, none bumps every table
+    """
+    version = next(_versionClock)
+    for table in tables or [table["name"] for table in Tables]:
+        _tableVersions[table] = version
+    if _activeConnector() is not None:
+        _local.bumped.append(tables)
 
 
-def _createTable(name, colNames, colTypes, extraProperties, foreignKey=None, checks=None, extraStatements=None):
+def _getCached(name, params=()) -> List[int]:
+    """
+    Runs a statement declared with tables through ResultCache, calls inside a transaction() scope skip the cache.
+    Only writes made through this module's functions are noticed.
+    :return: the first column of the rows, [] if the query failed
+    """
+    if not Statements:
+        defineStatements()
+    cacheable = _activeConnector() is None
+    # taken before the query runs, so a write that commits meanwhile makes the result stale rather than lost
+    key = (name, tuple(params), tuple(_tableVersions[table] for table in Statements[name]["tables"]))
+    if cacheable:
+        found, values = ResultCache.get(key)
+        if found:
+            return list(values)
+
+    res = sendPrepared(name, params)
+    if res.Status != ReturnValue.OK:
+        return []
+
+    values = [row[0] for row in res.Set.rows]
+    if cacheable:
+        ResultCache.put(key, tuple(values))
+    return values
+
+
+def _createTable(name, colNames, colTypes, extraProperties, foreignKey=None, checks=None, extraStatements=None,
+                 indexes=None):
     """
     :param name: The Table name
     :param colNames: a list of column names
@@ -63,6 +307,7 @@ def _createTable(name, colNames, colTypes, extraProperties, foreignKey=None, che
         toDelete is a boolean list that state whether a foreign key need to enforce delete from reference table
     :param checks: To add a check to cols. (e.g., teamId > 0 )
     :param extraStatements: Sometimes, we need more generic statements. (e.g., explicit primary keys, checks, etc.)
+    :param indexes: secondary indexes on the table, a list of _createIndex dictionaries
     :return: a dictionary with the table metadata for the table generator
     """
     if foreignKey is None:
@@ -71,6 +316,8 @@ def _createTable(name, colNames, colTypes, extraProperties, foreignKey=None, che
         extraStatements = []
     if checks is None:
         checks = []
+    if indexes is None:
+        indexes = []
 
     assert len(colNames) == len(colTypes)
     assert len(colNames) == len(extraProperties)
@@ -82,21 +329,113 @@ def _createTable(name, colNames, colTypes, extraProperties, foreignKey=None, che
         "extraProperties": extraProperties,
         "foreignKey": foreignKey,
         "checks": checks,
-        "extraStatements": extraStatements
+        "extraStatements": extraStatements,
+        "indexes": indexes
     }
 
 
-def _createView(name, query, toMaterialize):
+def _createIndex(cols, include=None, where=None, unique=False):
+    """
+    :param cols: the indexed cols, comma separated, may carry an order (e.g., "teamId, amount DESC")
+    :param include: cols stored in the index but not searched on, for index-only scans (e.g., "attendance")
+    :param where: a predicate for a partial index (e.g., "height > 190")
+    :param unique: create a UNIQUE index
+    :return: a dictionary with the index metadata for the index generator
+    """
+    return {
+        "cols": cols,
+        "include": include,
+        "where": where,
+        "unique": unique
+    }
+
+
+# named after its definition: a changed index is a new index, and the rebuild drops the old one
+def _indexName(relation, index) -> str:
+    definition = repr(sorted(index.items()))
+    return relation + "_idx_" + hashlib.sha256(definition.encode()).hexdigest()[:8]
+
+
+def _indexQuery(relation, index) -> str:
+    q = "CREATE "
+    if index["unique"]:
+        q += "UNIQUE "
+    q += "INDEX IF NOT EXISTS " + _indexName(relation, index) + " ON " + relation + " (" + index["cols"] + ")"
+    if index["include"] is not None:
+        q += " INCLUDE (" + index["include"] + ")"
+    if index["where"] is not None:
+        q += " WHERE " + index["where"]
+    return q
+
+
+def _createView(name, query, toMaterialize, dependsOn, uniqueKey=None, indexes=None):
+    """
+    :param name: The view name
+    :param query: The view query
+    :param toMaterialize: create it as a materialized view
+    :param dependsOn: the tables and views the query reads, a write to them makes a materialized view stale
+    :param uniqueKey: cols that identify a row, a unique index on them lets the view be refreshed CONCURRENTLY
+    :param indexes: extra indexes for a materialized view, a list of _createIndex dictionaries
+    :return: a dictionary with the view metadata for the view generator
+    """
+    if indexes is None:
+        indexes = []
+
+    return {
+        "name": name,
+        "query": query,
+        "toMaterialize": toMaterialize,
+        "dependsOn": dependsOn,
+        "uniqueKey": uniqueKey,
+        "indexes": indexes
+    }
+
+
+def _createTrigger(name, table, timing, events, body):
+    """
+    :param name: The trigger name, also the name of the plpgsql function it runs
+    :param table: The table it fires on, for each row
+    :param timing: BEFORE or AFTER
+    :param events: e.g. INSERT, DELETE OR UPDATE
+    :param body: the function's statements, between BEGIN and END
+    :return: a dictionary with the trigger metadata for the trigger generator
+    """
+    return {
+        "name": name,
+        "table": table,
+        "timing": timing,
+        "events": events,
+        "body": body
+    }
+
+
+def _createStatement(name, query, views=None, tables=None):
+    """
+    :param name: The statement name, also used as the name of the server-side prepared statement
+    :param query: The query, with $1, $2, ... placeholders for the parameters
+    :param views: the views the query reads, materialized ones are refreshed first if they are stale
+    :param tables: the base tables the result depends on, directly or through views and aggregates;
+                   the results of statements that declare them may be served from ResultCache (see _getCached)
+    :return: a dictionary with the statement metadata for sendPrepared
+    """
+    if views is None:
+        views = []
+    if tables is None:
+        tables = []
+
     return {
         "name": name,
         "query": query,
-        "toMaterialize": toMaterialize
+        "views": views,
+        "tables": tables
     }
 
 # endregion
 
 # region table & view definitions
 def defineTables():
+    Tables.clear()
+
     table_Teams = _createTable(name="Teams",
                                colNames=["teamId"],
                                colTypes=["int"],
@@ -108,20 +447,28 @@ def defineTables():
                                  colTypes=["int", "int", "int", "int", "varchar(8)"],
                                  extraProperties=["PRIMARY KEY", "NOT NULL", "NOT NULL", "NOT NULL", "NOT NULL"],
                                  foreignKey=[("teamId", "Teams(teamId)", True)],
-                                 checks=["playerId > 0", "age > 0", "height > 0", "foot = 'Right' OR foot = 'Left'"])
+                                 checks=["playerId > 0", "age > 0", "height > 0", "foot = 'Right' OR foot = 'Left'"],
+                                 indexes=[_createIndex("teamId"),
+                                          # tallTeams
+                                          _createIndex("teamId", where="height > 190")])
 
     table_Matches = _createTable(name="Matches",
                                  colNames=["matchId", "competition", "homeTeamId", "awayTeamId"],
                                  colTypes=["int", "varchar(16)", "int", "int"],
                                  extraProperties=["PRIMARY KEY", "NOT NULL", "NOT NULL", "NOT NULL"],
-                                 checks=["matchId > 0", "homeTeamId != awayTeamId", "competition = 'International' OR competition = 'Domestic'"])
+                                 checks=["matchId > 0", "homeTeamId != awayTeamId", "competition = 'International' OR competition = 'Domestic'"],
+                                 # activeTeams, minAttendancePerTeam
+                                 indexes=[_createIndex("homeTeamId", include="matchId"),
+                                          _createIndex("awayTeamId")])
 
     table_Stadiums = _createTable(name="Stadiums",
                                   colNames=["stadiumId", "capacity", "teamId"],
                                   colTypes=["int", "int", "int"],
                                   extraProperties=["PRIMARY KEY", "NOT NULL", "UNIQUE"],
                                   foreignKey=[("teamId", "Teams(teamId)", True)],
-                                  checks=["stadiumId > 0", "capacity > 0"])
+                                  checks=["stadiumId > 0", "capacity > 0"],
+                                  # getActiveTallRichTeams
+                                  indexes=[_createIndex("capacity", include="teamId")])
 
     table_Scores = _createTable(name="Scores",
                                 colNames=["playerId", "matchId", "amount"],
@@ -129,14 +476,18 @@ def defineTables():
                                 extraProperties=["NOT NULL", "NOT NULL", "NOT NULL"],
                                 foreignKey=[("playerId", "Players(playerId)", True), ("matchId", "Matches(matchId)", True)],
                                 checks=["amount > 0"],
-                                extraStatements=[", CONSTRAINT match_player PRIMARY KEY (playerId, matchId)"])
+                                extraStatements=[", CONSTRAINT match_player PRIMARY KEY (playerId, matchId)"],
+                                # the aggregate triggers and deleting a match
+                                indexes=[_createIndex("matchId", include="playerId, amount")])
 
     table_MatchInStadium = _createTable(name="MatchInStadium",
                                         colNames=["matchId", "stadiumId", "attendance"],
                                         colTypes=["int", "int", "int"],
                                         extraProperties=["PRIMARY KEY", "NOT NULL", "NOT NULL"],
                                         foreignKey=[("matchId", "Matches(matchId)", True)],
-                                        checks=["attendance > 0"])
+                                        checks=["attendance > 0"],
+                                        # averageAttendanceInStadium
+                                        indexes=[_createIndex("stadiumId", include="attendance")])
 
     Tables.append(table_Teams)
     Tables.append(table_Players)
@@ -145,125 +496,579 @@ def defineTables():
     Tables.append(table_Scores)
     Tables.append(table_MatchInStadium)
 
+    defineAggregates()
+
+
+# serializes the transactions writing one match: the Scores and MatchInStadium triggers read the other table, and
+# once the lock is granted their next statement sees what the other writers committed (READ COMMITTED)
+def _lockMatch(row) -> str:
+    return "PERFORM 1 FROM Matches WHERE matchId = " + row + ".matchId FOR NO KEY UPDATE; "
+
+
+def defineAggregates():
+    """
+    Goals per match, player and stadium and the co-appearance pairs, kept up to date by row triggers that apply
+    only each write's delta.
+    Rows leaving Scores and MatchInStadium are handled in BEFORE triggers: a deleted match cascades to both
+    tables, and a BEFORE trigger still sees the other table as it was, whichever cascade runs first.
+    Every Scores and MatchInStadium trigger first locks the match's row (see _lockMatch).
+    """
+    Triggers.clear()
+
+    # matches with at least one score
+    table_goalsPerMatch = _createTable(name="goalsPerMatch",
+                                       colNames=["matchId", "goals"],
+                                       colTypes=["int", "int"],
+                                       extraProperties=["PRIMARY KEY", "NOT NULL"])
+
+    # every player, with 0 goals until they score
+    table_goalsPerPlayer = _createTable(name="goalsPerPlayer",
+                                        colNames=["playerId", "teamId", "amount"],
+                                        colTypes=["int", "int", "int"],
+                                        extraProperties=["PRIMARY KEY", "NOT NULL", "NOT NULL"],
+                                        # mostGoalsForTeam
+                                        indexes=[_createIndex("teamId, amount DESC, playerId DESC")])
+
+    # stadiums that had matches in them
+    table_goalsPerStadium = _createTable(name="goalsPerStadium",
+                                         colNames=["stadiumId", "goals", "matches"],
+                                         colTypes=["int", "int", "int"],
+                                         extraProperties=["PRIMARY KEY", "NOT NULL", "NOT NULL"])
+
+    trigger_playerAdded = _createTrigger(name="playerAdded", table="Players", timing="AFTER", events="INSERT",
+                                         body="INSERT INTO goalsPerPlayer (playerId, teamId, amount) VALUES (NEW.playerId, NEW.teamId, 0); "
+                                              "RETURN NULL;")
+
+    trigger_playerChanged = _createTrigger(name="playerChanged", table="Players", timing="AFTER", events="UPDATE",
+                                           body="UPDATE goalsPerPlayer SET playerId = NEW.playerId, teamId = NEW.teamId WHERE playerId = OLD.playerId; "
+                                                "RETURN NULL;")
+
+    trigger_playerRemoved = _createTrigger(name="playerRemoved", table="Players", timing="AFTER", events="DELETE",
+                                           body="DELETE FROM goalsPerPlayer WHERE playerId = OLD.playerId; "
+                                                "RETURN NULL;")
+
+    trigger_scoreAdded = _createTrigger(name="scoreAdded", table="Scores", timing="AFTER", events="INSERT OR UPDATE",
+                                        body=_lockMatch("NEW") +
+                                             "INSERT INTO goalsPerMatch (matchId, goals) VALUES (NEW.matchId, NEW.amount) "
+                                             "ON CONFLICT (matchId) DO UPDATE SET goals = goalsPerMatch.goals + EXCLUDED.goals; "
+                                             "UPDATE goalsPerPlayer SET amount = amount + NEW.amount WHERE playerId = NEW.playerId; "
+                                             "UPDATE goalsPerStadium SET goals = goals + NEW.amount "
+                                             "WHERE stadiumId = (SELECT stadiumId FROM MatchInStadium WHERE matchId = NEW.matchId); "
+                                             "RETURN NULL;")
+
+    trigger_scoreRemoved = _createTrigger(name="scoreRemoved", table="Scores", timing="BEFORE", events="DELETE OR UPDATE",
+                                          body=_lockMatch("OLD") +
+                                               "UPDATE goalsPerMatch SET goals = goals - OLD.amount WHERE matchId = OLD.matchId; "
+                                               "DELETE FROM goalsPerMatch WHERE matchId = OLD.matchId AND goals = 0; "
+                                               "UPDATE goalsPerPlayer SET amount = amount - OLD.amount WHERE playerId = OLD.playerId; "
+                                               "UPDATE goalsPerStadium SET goals = goals - OLD.amount "
+                                               "WHERE stadiumId = (SELECT stadiumId FROM MatchInStadium WHERE matchId = OLD.matchId); "
+                                               "IF TG_OP = 'DELETE' THEN RETURN OLD; END IF; "
+                                               "RETURN NEW;")
+
+    trigger_matchInStadiumAdded = _createTrigger(name="matchInStadiumAdded", table="MatchInStadium", timing="AFTER", events="INSERT OR UPDATE",
+                                                 body=_lockMatch("NEW") +
+                                                      "INSERT INTO goalsPerStadium (stadiumId, goals, matches) "
+                                                      "VALUES (NEW.stadiumId, COALESCE((SELECT goals FROM goalsPerMatch WHERE matchId = NEW.matchId), 0), 1) "
+                                                      "ON CONFLICT (stadiumId) DO UPDATE SET goals = goalsPerStadium.goals + EXCLUDED.goals, "
+                                                      "matches = goalsPerStadium.matches + 1; "
+                                                      "RETURN NULL;")
+
+    trigger_matchInStadiumRemoved = _createTrigger(name="matchInStadiumRemoved", table="MatchInStadium", timing="BEFORE", events="DELETE OR UPDATE",
+                                                   body=_lockMatch("OLD") +
+                                                        "UPDATE goalsPerStadium SET matches = matches - 1, "
+                                                        "goals = goals - COALESCE((SELECT goals FROM goalsPerMatch WHERE matchId = OLD.matchId), 0) "
+                                                        "WHERE stadiumId = OLD.stadiumId; "
+                                                        "DELETE FROM goalsPerStadium WHERE stadiumId = OLD.stadiumId AND matches = 0; "
+                                                        "IF TG_OP = 'DELETE' THEN RETURN OLD; END IF; "
+                                                        "RETURN NEW;")
+
+    # players who scored in the same match, once per unordered pair (pid1 <= pid2) with the number of such
+    # matches; the pair (p, p) counts the matches p scored in
+    table_playerPairs = _createTable(name="playerPairs",
+                                     colNames=["pid1", "pid2", "together"],
+                                     colTypes=["int", "int", "int"],
+                                     extraProperties=["NOT NULL", "NOT NULL", "NOT NULL"],
+                                     extraStatements=[", CONSTRAINT player_pair PRIMARY KEY (pid1, pid2)"],
+                                     indexes=[_createIndex("pid2, pid1", include="together")])
+
+    # a BEFORE row trigger sees the rows its statement already handled, so a multi-row insert or delete
+    # (e.g., deleting a match) counts each pair exactly once
+    trigger_pairsChanged = _createTrigger(name="pairsChanged", table="Scores", timing="BEFORE",
+                                          events="INSERT OR DELETE OR UPDATE OF playerId, matchId",
+                                          body="IF TG_OP IN ('DELETE', 'UPDATE') THEN " +
+                                               _lockMatch("OLD") +
+                                               "UPDATE playerPairs SET together = together - 1 WHERE (pid1, pid2) IN "
+                                               "(SELECT LEAST(OLD.playerId, playerId), GREATEST(OLD.playerId, playerId) FROM Scores WHERE matchId = OLD.matchId); "
+                                               "DELETE FROM playerPairs WHERE together = 0 AND (pid1 = OLD.playerId OR pid2 = OLD.playerId); "
+                                               "END IF; "
+                                               "IF TG_OP IN ('INSERT', 'UPDATE') THEN " +
+                                               _lockMatch("NEW") +
+                                               "INSERT INTO playerPairs (pid1, pid2, together) "
+                                               "SELECT LEAST(NEW.playerId, playerId), GREATEST(NEW.playerId, playerId), 1 FROM Scores "
+                                               "WHERE matchId = NEW.matchId AND playerId <> NEW.playerId "
+                                               "AND (playerId, matchId) IS DISTINCT FROM (OLD.playerId, OLD.matchId) "
+                                               "UNION ALL SELECT NEW.playerId, NEW.playerId, 1 "
+                                               "ON CONFLICT (pid1, pid2) DO UPDATE SET together = playerPairs.together + 1; "
+                                               "RETURN NEW; "
+                                               "END IF; "
+                                               "RETURN OLD;")
+
+    Tables.append(table_goalsPerMatch)
+    Tables.append(table_goalsPerPlayer)
+    Tables.append(table_goalsPerStadium)
+    Tables.append(table_playerPairs)
+
+    Triggers.append(trigger_playerAdded)
+    Triggers.append(trigger_playerChanged)
+    Triggers.append(trigger_playerRemoved)
+    Triggers.append(trigger_scoreAdded)
+    Triggers.append(trigger_scoreRemoved)
+    Triggers.append(trigger_matchInStadiumAdded)
+    Triggers.append(trigger_matchInStadiumRemoved)
+    Triggers.append(trigger_pairsChanged)
+
 
 def defineViews():
+    Views.clear()
+
     view_personalStats = _createView(name="personalStats",
                                      query="SELECT Players.playerid, matchId, COALESCE(amount, 0) AS amount FROM Players LEFT JOIN scores ON Players.playerId = scores.playerId",
-                                     toMaterialize=False)
-
-    view_goalsPerMatch = _createView(name="goalsPerMatch",
-                                     query="SELECT SUM(amount) AS goals, matchId FROM Scores GROUP BY matchId",
-                                     toMaterialize=False)
-
-    view_goalsPerPlayer = _createView(name="goalsPerPlayer",
-                                      query="SELECT Players.playerId AS playerId, Players.teamId AS teamId, COALESCE(SUM(amount), 0) AS amount FROM players "
-                                            "LEFT JOIN Scores ON Players.playerId = Scores.playerId GROUP BY Players.playerId",
-                                      toMaterialize=False)
+                                     toMaterialize=MaterializeViews,
+                                     dependsOn=["Players", "Scores"],
+                                     uniqueKey="playerId, matchId")
 
     view_ActiveTeams = _createView(name="activeTeams",
                                    query="SELECT DISTINCT homeTeamId AS teamId FROM Matches UNION SELECT DISTINCT awayTeamId FROM Matches",
-                                   toMaterialize=False)
+                                   toMaterialize=MaterializeViews,
+                                   dependsOn=["Matches"],
+                                   uniqueKey="teamId")
 
     view_TallTeams = _createView(name="tallTeams",
                                  query="SELECT teamId FROM (SELECT teamId, COUNT(*) FROM Players WHERE height > 190 GROUP BY teamId) countTable WHERE count >= 2",
-                                 toMaterialize=False)
+                                 toMaterialize=MaterializeViews,
+                                 dependsOn=["Players"],
+                                 uniqueKey="teamId")
 
     view_ActiveTallTeams = _createView(name="activeTallTeams",
                                        query="SELECT * FROM tallTeams INTERSECT SELECT * FROM activeTeams",
-                                       toMaterialize=False)
+                                       toMaterialize=MaterializeViews,
+                                       dependsOn=["tallTeams", "activeTeams"],
+                                       uniqueKey="teamId")
 
     view_minAttendancePerTeam = _createView(name="minAttendancePerTeam",
                                             query="SELECT homeTeamId AS teamId, MIN(COALESCE(attendance, 0)) AS attendance "
                                                   "FROM Matches LEFT JOIN MatchInStadium ON Matches.matchId = MatchInStadium.matchId "
                                                   "GROUP BY homeTeamId",
-                                            toMaterialize=False)
-
-    # In stadiums that had matches in them
-    view_goalsPerStadium = _createView(name="goalsPerStadium",
-                                            query="SELECT stadiumId, SUM(COALESCE(goals, 0)) AS goals "
-                                                  "FROM matchInStadium LEFT JOIN goalsPerMatch ON matchInStadium.matchId = goalsPerMatch.matchId "
-                                                  "GROUP BY stadiumId",
-                                            toMaterialize=False)
-
-    view_friends = _createView(name="friends",
-                               query="SELECT P1.PlayerId AS pid1, P2.PlayerId AS pid2 FROM Scores P1, Scores P2 WHERE P1.matchId = P2.matchId",
-                               toMaterialize=False)
+                                            toMaterialize=MaterializeViews,
+                                            dependsOn=["Matches", "MatchInStadium"],
+                                            uniqueKey="teamId")
 
 
 
     Views.append(view_personalStats)
-    Views.append(view_goalsPerMatch)
-    Views.append(view_goalsPerPlayer)
     Views.append(view_ActiveTeams)
     Views.append(view_TallTeams)
     Views.append(view_ActiveTallTeams)
     Views.append(view_minAttendancePerTeam)
-    Views.append(view_goalsPerStadium)
-    Views.append(view_friends)
+
+
+def defineStatements():
+    statements = [
+        _createStatement(name="addTeam",
+                         query="INSERT INTO Teams (teamId) VALUES ($1)"),
+
+        _createStatement(name="addMatch",
+                         query="INSERT INTO Matches (matchId ,competition, homeTeamId, awayTeamId) VALUES ($1, $2, $3, $4)"),
+        _createStatement(name="getMatchProfile",
+                         query="SELECT * FROM Matches WHERE matchId = $1"),
+        _createStatement(name="deleteMatch",
+                         query="DELETE FROM Matches WHERE matchId = $1"),
+
+        _createStatement(name="addPlayer",
+                         query="INSERT INTO players (playerId, teamId, age, height, foot) VALUES ($1, $2, $3, $4, $5)"),
+        _createStatement(name="getPlayerProfile",
+                         query="SELECT * FROM players WHERE playerId = $1"),
+        _createStatement(name="deletePlayer",
+                         query="DELETE FROM players WHERE playerId = $1"),
+
+        _createStatement(name="addStadium",
+                         query="INSERT INTO stadiums (stadiumId, capacity, teamId) VALUES ($1, $2, $3)"),
+        _createStatement(name="getStadiumProfile",
+                         query="SELECT * FROM stadiums WHERE stadiumId = $1"),
+        _createStatement(name="deleteStadium",
+                         query="DELETE FROM stadiums WHERE stadiumId = $1"),
+
+        _createStatement(name="playerScoredInMatch",
+                         query="INSERT INTO Scores (playerId, matchId, amount) VALUES ($1, $2, $3)"),
+        _createStatement(name="playerDidntScoreInMatch",
+                         query="DELETE FROM Scores WHERE matchId = $1 AND playerId = $2"),
+        _createStatement(name="matchInStadium",
+                         query="INSERT INTO MatchInStadium (matchId, stadiumId, attendance) VALUES ($1, $2, $3)"),
+        _createStatement(name="matchNotInStadium",
+                         query="DELETE FROM MatchInStadium WHERE matchId = $1 AND stadiumId = $2"),
+        _createStatement(name="averageAttendanceInStadium",
+                         query="SELECT COALESCE(AVG(attendance), 0) FROM MatchInStadium WHERE stadiumId = $1"),
+        _createStatement(name="stadiumTotalGoals",
+                         query="SELECT COALESCE(SUM(goals), 0) FROM goalsPerStadium WHERE stadiumId = $1"),
+        _createStatement(name="playerIsWinner",
+                         query="SELECT amount FROM personalStats WHERE playerId = $1 AND matchID = $2"
+                               " UNION ALL SELECT goals AS amount FROM goalsPerMatch WHERE matchID = $2",
+                         views=["personalStats"]),
+        _createStatement(name="getActiveTallTeams",
+                         query="SELECT * FROM activeTallTeams ORDER BY teamId DESC LIMIT 5",
+                         views=["activeTallTeams"],
+                         tables=["Players", "Matches"]),
+        _createStatement(name="getActiveTallRichTeams",
+                         query="SELECT teamId FROM activeTallTeams INTERSECT "
+                               "SELECT teamId FROM Stadiums WHERE capacity > 55000 ORDER BY teamId ASC LIMIT 5",
+                         views=["activeTallTeams"],
+                         tables=["Players", "Matches", "Stadiums"]),
+        _createStatement(name="popularTeams",
+                         query="SELECT teamId FROM "
+                               "(SELECT Teams.teamId AS teamId, attendance FROM Teams LEFT JOIN minAttendancePerTeam ON Teams.teamId = minAttendancePerTeam.teamId) t"
+                               " WHERE attendance > 40000 OR attendance IS NULL ORDER BY teamId DESC LIMIT 10",
+                         views=["minAttendancePerTeam"],
+                         tables=["Teams", "Matches", "MatchInStadium"]),
+
+        _createStatement(name="getMostAttractiveStadiums",
+                         query="SELECT Stadiums.stadiumId AS stadiumId, COALESCE(goals, 0) AS goals FROM Stadiums "
+                               "LEFT JOIN goalsPerStadium ON Stadiums.stadiumId = goalsPerStadium.stadiumId "
+                               "ORDER BY goals DESC, stadiumId ASC",
+                         tables=["Stadiums", "Scores", "MatchInStadium"]),
+        _createStatement(name="mostGoalsForTeam",
+                         query="SELECT playerId FROM goalsPerPlayer WHERE teamId = $1 ORDER BY amount DESC, playerId DESC LIMIT 5",
+                         tables=["Players", "Scores"]),
+        # the players who played with $1 in at least half of its matches, or everyone if it has none
+        _createStatement(name="getClosePlayers",
+                         query="WITH self AS (SELECT together FROM playerPairs WHERE pid1 = $1 AND pid2 = $1), "
+                               "adjacent AS (SELECT pid2 AS pid, together FROM playerPairs WHERE pid1 = $1 AND pid2 <> $1 "
+                               "UNION ALL SELECT pid1, together FROM playerPairs WHERE pid2 = $1 AND pid1 <> $1) "
+                               "SELECT pid FROM adjacent, self WHERE adjacent.together * 2 >= self.together "
+                               "UNION ALL SELECT playerId FROM Players WHERE playerId <> $1 AND NOT EXISTS (SELECT 1 FROM self) "
+                               "ORDER BY 1 LIMIT 10"),
+    ]
+
+    for statement in statements:
+        Statements[statement["name"]] = statement
 # endregion
 
-# region Init
-def createTables():
-    defineTables()
-    defineViews()
+# region Materialized views
+def _materializedViews():
+    return [view for view in Views if view["toMaterialize"]]
 
-    # TODO: delete before submission
-    dropTables()
 
-    # Table creator generator
-    for table in Tables:
-        q = "CREATE TABLE " + table["name"] + " ("
+def _dependentViews(name) -> List[str]:
+    """
+    :param name: a table or view name
+    :return: the materialized views that read it, directly or through other views
+    """
+    names = {name.lower()}
+    for view in Views:  # a view always comes after the views it reads
+        if any(dependency.lower() in names for dependency in view["dependsOn"]):
+            names.add(view["name"].lower())
 
-        # add cols
-        for col_index in range(len(table["colNames"])):
-            q += table["colNames"][col_index] + " " + table["colTypes"][col_index]
-            q += " " + table["extraProperties"][col_index]
-            if col_index < len(table["colNames"]) - 1:
-                q += ", "
+    return [view["name"].lower() for view in _materializedViews()
+            if view["name"].lower() in names and view["name"].lower() != name.lower()]
 
-        # add foreign keys if exists
-        for key, ref, onDelete in table["foreignKey"]:
-            q += ", FOREIGN KEY ("+key+") REFERENCES "+ref
-            if onDelete:
-                q += " ON DELETE CASCADE"
 
-        # add checks
-        for check in table["checks"]:
-            q += ", CHECK(" + check + ")"
+def _staleCandidates(statement) -> List[str]:
+    """
+    :return: the materialized views a statement reads, with the views they read, in refresh order
+    """
+    if "refresh" not in statement:
+        if not Views:
+            defineViews()
+        needed = set(view.lower() for view in statement["views"])
+        for view in reversed(Views):
+            if view["name"].lower() in needed:
+                needed.update(dependency.lower() for dependency in view["dependsOn"])
+        statement["refresh"] = [view["name"].lower() for view in _materializedViews() if view["name"].lower() in needed]
 
-        # add special primary keys if exists
-        for extraStatements in table["extraStatements"]:
-            q += extraStatements
+    return statement["refresh"]
 
-        q += ");"
 
-        sendQuery(q)
+def _viewRefreshQueries() -> list:
+    """
+    Refresh policy for materialized views: statement-level triggers on every table a view reads mark the view
+    stale in ViewRefreshState, and refreshStaleViews (called by sendPrepared before a statement reads the view)
+    refreshes the stale ones in dependency order, CONCURRENTLY when the view has a unique key.
+    :return: the queries that set it up
+    """
+    views = _materializedViews()
+    if not views:
+        return []
+
+    queries = ["CREATE TABLE IF NOT EXISTS ViewRefreshState (name varchar PRIMARY KEY, position int NOT NULL, "
+               "concurrent boolean NOT NULL, stale boolean NOT NULL)"]
+
+    for position, view in enumerate(views):
+        if view["uniqueKey"] is not None:
+            queries.append("CREATE UNIQUE INDEX IF NOT EXISTS " + view["name"] + "_key ON " + view["name"] + " (" + view["uniqueKey"] + ")")
+        for index in view["indexes"]:
+            queries.append(_indexQuery(view["name"], index))
+
+        q = (sql.SQL("INSERT INTO ViewRefreshState (name, position, concurrent, stale) VALUES ({name}, {position}, {concurrent}, false) "
+                     "ON CONFLICT (name) DO NOTHING")
+             .format(name=sql.Literal(view["name"].lower()),
+                     position=sql.Literal(position),
+                     concurrent=sql.Literal(view["uniqueKey"] is not None)))
+        queries.append(q)
+
+    queries.append("CREATE OR REPLACE FUNCTION markViewsStale() RETURNS trigger AS $$ "
+                   "BEGIN "
+                   "UPDATE ViewRefreshState SET stale = true WHERE name = ANY(TG_ARGV) AND NOT stale; "
+                   "RETURN NULL; "
+                   "END $$ LANGUAGE plpgsql")
+
+    queries.append("CREATE OR REPLACE FUNCTION refreshStaleViews(viewNames text[]) RETURNS void AS $$ "
+                   "DECLARE state record; "
+                   "BEGIN "
+                   "FOR state IN SELECT name, concurrent FROM ViewRefreshState WHERE name = ANY(viewNames) AND stale "
+                   "ORDER BY position FOR UPDATE LOOP "
+                   "IF state.concurrent THEN EXECUTE format('REFRESH MATERIALIZED VIEW CONCURRENTLY %I', state.name); "
+                   "ELSE EXECUTE format('REFRESH MATERIALIZED VIEW %I', state.name); "
+                   "END IF; "
+                   "UPDATE ViewRefreshState SET stale = false WHERE name = state.name; "
+                   "END LOOP; "
+                   "END $$ LANGUAGE plpgsql")
+
+    for table in Tables:
+        dependents = _dependentViews(table["name"])
+        if dependents:
+            q = ("CREATE OR REPLACE TRIGGER " + table["name"] + "_markViewsStale AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON "
+                 + table["name"] + " FOR EACH STATEMENT EXECUTE FUNCTION markViewsStale("
+                 + ", ".join("'" + name + "'" for name in dependents) + ")")
+            queries.append(q)
+
+    return queries
+
+
+def _dropViewRefreshQueries() -> list:
+    # CASCADE drops the triggers that call markViewsStale
+    return ["DROP TABLE IF EXISTS ViewRefreshState",
+            "DROP FUNCTION IF EXISTS refreshStaleViews",
+            "DROP FUNCTION IF EXISTS markViewsStale CASCADE"]
+# endregion
+
+# region Init
+def createTables():
+    """
+    Brings the database to the schema described by Tables, Triggers and Views, keeping the data in it.
+    The schema is compiled into one idempotent script, and a hash of it is kept in SchemaVersion: when the
+    database already has this hash, the check is the only query sent. Otherwise the script runs in one round trip
+    and one transaction: missing tables are created, generated indexes no longer defined are dropped and the new
+    ones created (see _indexName), trigger functions and triggers are replaced, and the views (which hold no data
+    of their own) are rebuilt. Tables are never dropped here.
+    Everything is created in the schema set with DBConnector.configureSchema, if any, which is created too.
+    :raise DatabaseException: if the script failed (nothing of it is kept), or an existing table differs from its
+                              definition (see _checkTables); dropTables() and createTables() rebuild it, losing
+                              its rows
+    """
+    defineTables()
+    defineViews()
+    defineStatements()
+
+    queries = _schemaQueries()
+    version = hashlib.sha256("\n".join(str(q) for q in queries).encode()).hexdigest()
+
+    res = sendQuery("SELECT hash FROM SchemaVersion")
+    if res.Status == ReturnValue.OK and res.RowsAffected == 1 and res.Set.rows[0][0] == version:
+        return
+
+    _checkTables()
+    # serializes processes bootstrapping the same schema at the same time
+    bootstrap = ["SELECT pg_advisory_xact_lock(236363, hashtext(current_setting('search_path')))"]
+    if Connector.getSchema() is not None:
+        bootstrap.append("CREATE SCHEMA IF NOT EXISTS " + Connector.getSchema())
+    queries = bootstrap + [_dropViewsQuery(), _dropStaleIndexesQuery()] + _dropViewRefreshQueries() + queries
+    queries.append("CREATE TABLE IF NOT EXISTS SchemaVersion (hash varchar NOT NULL)")
+    queries.append("DELETE FROM SchemaVersion")
+    queries.append(sql.SQL("INSERT INTO SchemaVersion (hash) VALUES ({hash})").format(hash=sql.Literal(version)))
+    _runScript(queries)
+    _evict()
+    _bump()
+
+
+def _runScript(queries):
+    """
+    Runs the queries in one round trip and one transaction, all or nothing.
+    :raise DatabaseException: the error of the first failing query
+    """
+    active = _activeConnector()
+    dbConnector = active if active is not None else Connector.DBConnector()
+    try:
+        with dbConnector.transaction():
+            dbConnector.executeMany(queries, atomic=True)
+    except psycopg2.Error as e:
+        raise Connector._databaseException(e.pgcode, str(e).strip())
+    finally:
+        if active is None:
+            dbConnector.close()
+
+
+# the columns (name, type, NOT NULL) and the constraints of the given tables of the current schema
+_DESCRIBE_TABLES = ("SELECT relname, "
+                    "ARRAY(SELECT attname || ' ' || format_type(atttypid, atttypmod) "
+                    "|| CASE WHEN attnotnull THEN ' NOT NULL' ELSE '' END FROM pg_attribute "
+                    "WHERE attrelid = pg_class.oid AND attnum > 0 AND NOT attisdropped ORDER BY attnum), "
+                    "ARRAY(SELECT pg_get_constraintdef(oid) FROM pg_constraint WHERE conrelid = pg_class.oid ORDER BY 1) "
+                    "FROM pg_class WHERE relnamespace = current_schema()::regnamespace AND relkind = 'r' "
+                    "AND relname = ANY(%s)")
+
+
+# CREATE TABLE IF NOT EXISTS keeps a table as it is, so a table that differs from its definition (columns, types,
+# keys, checks) is refused rather than kept. The definitions are built in a scratch schema, described by the
+# catalog the same way as the existing tables, and rolled back.
+def _checkTables():
+    names = {table["name"].lower(): table["name"] for table in Tables}
+    active = _activeConnector()
+    dbConnector = active if active is not None else Connector.DBConnector()
+    existing, defined = {}, {}
+    try:
+        with dbConnector.transaction():
+            _, res = dbConnector.execute(_DESCRIBE_TABLES, params=(list(names),))
+            existing = {row[0]: (row[1], row[2]) for row in res.rows}
+            if existing:
+                scratch = "schema_check_" + uuid.uuid4().hex
+                dbConnector.execute("CREATE SCHEMA " + scratch)
+                dbConnector.execute("SET LOCAL search_path TO " + scratch)
+                for table in Tables:
+                    dbConnector.execute(_tableQuery(table))
+                _, res = dbConnector.execute(_DESCRIBE_TABLES, params=(list(names),))
+                defined = {row[0]: (row[1], row[2]) for row in res.rows}
+            raise _RollBack()
+    except _RollBack:
+        pass
+    except psycopg2.Error as e:
+        raise Connector._databaseException(e.pgcode, str(e).strip())
+    finally:
+        if active is None:
+            dbConnector.close()
+
+    for name, description in existing.items():
+        if description == defined[name]:
+            continue
+        found, expected = description[0] + description[1], defined[name][0] + defined[name][1]
+        extra = [item for item in found if item not in expected]
+        missing = [item for item in expected if item not in found]
+        differences = (["has " + item for item in extra] + ["lacks " + item for item in missing]
+                       or ["its columns are in another order"])
+        raise DatabaseException.UNKNOWN_ERROR(
+            names[name] + " differs from its definition (" + "; ".join(differences)
+            + "), call dropTables() and createTables() to rebuild it (its rows are lost)")
+
+
+# drops the generated indexes no longer defined, the ones named by position before included
+def _dropStaleIndexesQuery() -> sql.Composed:
+    names = [_indexName(relation["name"], index).lower() for relation in Tables + Views for index in relation["indexes"]]
+    return sql.SQL("DO $$ DECLARE i record; BEGIN "
+                   "FOR i IN SELECT relname FROM pg_class "
+                   "WHERE relnamespace = current_schema()::regnamespace AND relkind = 'i' "
+                   "AND relname ~ '_idx(_[0-9a-f]{{8}}|[0-9]+)$' AND NOT relname = ANY({names}) LOOP "
+                   "EXECUTE 'DROP INDEX IF EXISTS ' || quote_ident(i.relname); "
+                   "END LOOP; END $$").format(names=sql.Literal(names))
+
+
+# drops the views of Views, of either kind, whichever schema version created them
+def _dropViewsQuery() -> sql.Composed:
+    return sql.SQL("DO $$ DECLARE v record; BEGIN "
+                   "FOR v IN SELECT relname, relkind FROM pg_class "
+                   "WHERE relnamespace = current_schema()::regnamespace AND relkind IN ('v', 'm') "
+                   "AND relname = ANY({names}) LOOP "
+                   "EXECUTE 'DROP ' || CASE v.relkind WHEN 'm' THEN 'MATERIALIZED VIEW ' ELSE 'VIEW ' END "
+                   "|| 'IF EXISTS ' || quote_ident(v.relname) || ' CASCADE'; "
+                   "END LOOP; END $$").format(names=sql.Literal([view["name"].lower() for view in Views]))
+
+
+# Table creator generator
+def _tableQuery(table) -> str:
+    q = "CREATE TABLE IF NOT EXISTS " + table["name"] + " ("
+
+    # add cols
+    for col_index in range(len(table["colNames"])):
+        q += table["colNames"][col_index] + " " + table["colTypes"][col_index]
+        q += " " + table["extraProperties"][col_index]
+        if col_index < len(table["colNames"]) - 1:
+            q += ", "
+
+    # add foreign keys if exists
+    for key, ref, onDelete in table["foreignKey"]:
+        q += ", FOREIGN KEY ("+key+") REFERENCES "+ref
+        if onDelete:
+            q += " ON DELETE CASCADE"
+
+    # add checks
+    for check in table["checks"]:
+        q += ", CHECK(" + check + ")"
+
+    # add special primary keys if exists
+    for extraStatements in table["extraStatements"]:
+        q += extraStatements
+
+    q += ");"
+    return q
+
+
+def _schemaQueries() -> list:
+    # in dependency order: tables (and their indexes), trigger functions and triggers, views, view refresh
+    queries = []
+
+    for table in Tables:
+        queries.append(_tableQuery(table))
+        for index in table["indexes"]:
+            queries.append(_indexQuery(table["name"], index))
+
+    # Trigger generator
+    for trigger in Triggers:
+        queries.append("CREATE OR REPLACE FUNCTION " + trigger["name"] + "() RETURNS trigger AS $$ BEGIN "
+                       + trigger["body"] + " END $$ LANGUAGE plpgsql")
+        queries.append("CREATE OR REPLACE TRIGGER " + trigger["name"] + " " + trigger["timing"] + " "
+                       + trigger["events"] + " ON " + trigger["table"] + " FOR EACH ROW EXECUTE FUNCTION "
+                       + trigger["name"] + "()")
 
     for view in Views:
-        q = "CREATE "
         if view["toMaterialize"]:
-            q += "MATERIALIZED "
-        q += "VIEW " + view["name"] + " AS " + view["query"] + ";"
-        sendQuery(q)
+            q = "CREATE MATERIALIZED VIEW IF NOT EXISTS "
+        else:
+            q = "CREATE OR REPLACE VIEW "
+        q += view["name"] + " AS " + view["query"] + ";"
+        queries.append(q)
+
+    return queries + _viewRefreshQueries()
 
 
 def clearTables():
-    for table in reversed(Tables):
-        q = "DELETE FROM " + table["name"]
-        sendQuery(q)
+    """
+    Empties every table, aggregate tables included, with a single TRUNCATE: no dead rows are left behind and
+    the cost does not depend on how many rows there were. The materialized views are refreshed (over empty
+    tables) and marked fresh in the same transaction.
+    """
+    queries = ["TRUNCATE " + ", ".join(table["name"] for table in Tables) + " RESTART IDENTITY CASCADE"]
+    views = _materializedViews()
+    if views:
+        queries += ["REFRESH MATERIALIZED VIEW " + view["name"] for view in views]
+        queries.append("UPDATE ViewRefreshState SET stale = false")
+    _runScript(queries)
+    _evict()
+    _bump()
 
 
-def dropTables():
-    for view in reversed(Views):
-        q = "DROP "
-        if view["toMaterialize"]:
-            q += "MATERIALIZED "
-        q += "VIEW " + view["name"]
-        sendQuery(q)
+def _dropQueries() -> list:
+    # CASCADE drops the views and triggers on the tables too, whichever schema version created them
+    queries = ["DROP TABLE IF EXISTS " + table["name"] + " CASCADE" for table in reversed(Tables)]
 
-    for table in reversed(Tables):
-        q = "DROP TABLE " + table["name"]
-        sendQuery(q)
+    for trigger in Triggers:
+        queries.append("DROP FUNCTION IF EXISTS " + trigger["name"])
+
+    return queries + _dropViewRefreshQueries() + ["DROP TABLE IF EXISTS SchemaVersion"]
+
+
+def dropTables():
+    # one round trip and one transaction for the whole drop
+    _runScript(_dropQueries())
+    _evict()
+    _bump()
 
 
 # endregion
@@ -271,47 +1076,38 @@ def dropTables():
 # region Team
 
 def addTeam(teamID: int) -> ReturnValue:
-    q = sql.SQL("INSERT INTO Teams (teamId) VALUES ({teamID});").format(teamID=sql.Literal(teamID))
-    return sendQuery(q, True).Status
+    res = sendPrepared("addTeam", (teamID,), True)
+    _bump("Teams")
+    return res.Status
 
 # endregion
 
 # region Match
-def _sqlToMatch(res: Connector.ResultSet) -> Match:
-    row = res.rows[0]
-    matchId = row[0]
-    competition = row[1]
-    homeTeamID = row[2]
-    awayTeamID = row[3]
-
-    return Match(matchId, competition, homeTeamID, awayTeamID)
+# Matches' columns are in the order of Match's constructor, see Match.fromRows for many rows
+def _sqlToMatch(row) -> Match:
+    return Match(*row)
 
 
 def addMatch(match: Match) -> ReturnValue:
-    q = (sql.SQL("INSERT INTO Matches (matchId ,competition, homeTeamId, awayTeamId) VALUES ({matchId}, {competition}, {homeTeamId}, {awayTeamId});")
-         .format(matchId=sql.Literal(match.getMatchID()),
-                 competition=sql.Literal(match.getCompetition()),
-                 homeTeamId=sql.Literal(match.getHomeTeamID()),
-                 awayTeamId=sql.Literal(match.getAwayTeamID())
-                 ))
-
-    return sendQuery(q, True).Status
+    params = (match.getMatchID(), match.getCompetition(), match.getHomeTeamID(), match.getAwayTeamID())
+    res = sendPrepared("addMatch", params, True)
+    _evict(("getMatchProfile", match.getMatchID()))
+    _bump("Matches")
+    return res.Status
 
 
 def getMatchProfile(matchID: int) -> Match:
-    q = sql.SQL("SELECT * FROM Matches WHERE matchId ={matchID};").format(matchID=sql.Literal(matchID))
-    res = sendQuery(q)
-
-    if res.Status != ReturnValue.OK or res.RowsAffected == 0:
+    row = _getProfile("getMatchProfile", matchID)
+    if row is None:
         return Match.badMatch()
 
-    return _sqlToMatch(res.Set)
+    return _sqlToMatch(row)
 
 
 def deleteMatch(match: Match) -> ReturnValue:
-    q = sql.SQL("DELETE FROM Matches WHERE  matchId = {matchID};").format(matchID=sql.Literal(match.getMatchID()))
-
-    res = sendQuery(q)
+    res = sendPrepared("deleteMatch", (match.getMatchID(),))
+    _evict(("getMatchProfile", match.getMatchID()))
+    _bump("Matches", "Scores", "MatchInStadium")
     if res.Status == ReturnValue.OK and res.RowsAffected == 0:
         return ReturnValue.NOT_EXISTS
 
@@ -320,40 +1116,31 @@ def deleteMatch(match: Match) -> ReturnValue:
 # endregion
 
 # region Player
-def _sqlToPlayer(res: Connector.ResultSet) -> Player:
-    row = res.rows[0]
-    return Player(playerID=row[0],
-                  teamID=row[1],
-                  age=row[2],
-                  height=row[3],
-                  foot=row[4])
+# Players' columns are in the order of Player's constructor, see Player.fromRows for many rows
+def _sqlToPlayer(row) -> Player:
+    return Player(*row)
 
 
 def addPlayer(player: Player) -> ReturnValue:
-    q = (sql.SQL("INSERT INTO players (playerId, teamId, age, height, foot) VALUES ({playerId}, {teamId}, {age}, {height}, {foot});")
-         .format(playerId=sql.Literal(player.getPlayerID()),
-                 teamId=sql.Literal(player.getTeamID()),
-                 age=sql.Literal(player.getAge()),
-                 height=sql.Literal(player.getHeight()),
-                 foot=sql.Literal(player.getFoot())
-                 ))
-    return sendQuery(q, True).Status
+    params = (player.getPlayerID(), player.getTeamID(), player.getAge(), player.getHeight(), player.getFoot())
+    res = sendPrepared("addPlayer", params, True)
+    _evict(("getPlayerProfile", player.getPlayerID()))
+    _bump("Players")
+    return res.Status
 
 
 def getPlayerProfile(playerID: int) -> Player:
-    q = sql.SQL("SELECT * FROM players WHERE playerId ={playerID};").format(playerID=sql.Literal(playerID))
-    res = sendQuery(q)
-
-    if res.Status != ReturnValue.OK or res.RowsAffected == 0:
+    row = _getProfile("getPlayerProfile", playerID)
+    if row is None:
         return Player.badPlayer()
 
-    return _sqlToPlayer(res.Set)
+    return _sqlToPlayer(row)
 
 
 def deletePlayer(player: Player) -> ReturnValue:
-    q = sql.SQL("DELETE FROM players WHERE  playerId = {playerId};").format(playerId=sql.Literal(player.getPlayerID()))
-
-    res = sendQuery(q)
+    res = sendPrepared("deletePlayer", (player.getPlayerID(),))
+    _evict(("getPlayerProfile", player.getPlayerID()))
+    _bump("Players", "Scores")
     if res.Status == ReturnValue.OK and res.RowsAffected == 0:
         return ReturnValue.NOT_EXISTS
 
@@ -361,37 +1148,33 @@ def deletePlayer(player: Player) -> ReturnValue:
 # endregion
 
 # region Stadium
-def _sqlToStadium(res: Connector.ResultSet) -> Stadium:
-    row = res.rows[0]
-    return Stadium(stadiumID=row[0],
-                   capacity=row[1],
-                   belongsTo=row[2])
+# Stadiums' columns are in the order of Stadium's constructor, see Stadium.fromRows for many rows
+def _sqlToStadium(row) -> Stadium:
+    return Stadium(*row)
 
 
 def addStadium(stadium: Stadium) -> ReturnValue:
     # TODO: check return ALREADY_EXISTS if a Stadium with the same ID already exists or the team already owns a stadium
 
-    q = (sql.SQL("INSERT INTO stadiums (stadiumId, capacity, teamId) VALUES ({stadiumId}, {cap}, {belong});")
-         .format(stadiumId=sql.Literal(stadium.getStadiumID()),
-                 cap=sql.Literal(stadium.getCapacity()),
-                 belong=sql.Literal(stadium.getBelongsTo())))
-
-    return sendQuery(q, True).Status
+    params = (stadium.getStadiumID(), stadium.getCapacity(), stadium.getBelongsTo())
+    res = sendPrepared("addStadium", params, True)
+    _evict(("getStadiumProfile", stadium.getStadiumID()))
+    _bump("Stadiums")
+    return res.Status
 
 
 def getStadiumProfile(stadiumID: int) -> Stadium:
-    q = sql.SQL("SELECT * FROM stadiums WHERE stadiumId = {stadiumID};").format(stadiumID=sql.Literal(stadiumID))
-    res = sendQuery(q)
-
-    if res.Status != ReturnValue.OK or res.RowsAffected == 0:
+    row = _getProfile("getStadiumProfile", stadiumID)
+    if row is None:
         return Stadium.badStadium()
 
-    return _sqlToStadium(res.Set)
+    return _sqlToStadium(row)
 
 
 def deleteStadium(stadium: Stadium) -> ReturnValue:
-    q = sql.SQL("DELETE FROM stadiums WHERE stadiumId = {stadiumID};").format(stadiumID=sql.Literal(stadium.getStadiumID()))
-    res = sendQuery(q)
+    res = sendPrepared("deleteStadium", (stadium.getStadiumID(),))
+    _evict(("getStadiumProfile", stadium.getStadiumID()))
+    _bump("Stadiums")
     if res.Status == ReturnValue.OK and res.RowsAffected == 0:
         return ReturnValue.NOT_EXISTS
 
@@ -400,19 +1183,14 @@ def deleteStadium(stadium: Stadium) -> ReturnValue:
 
 # region Basic API
 def playerScoredInMatch(match: Match, player: Player, amount: int) -> ReturnValue:
-    q = (sql.SQL("INSERT INTO Scores (playerId, matchId, amount) VALUES ({playerId},{matchId},{amount});")
-         .format(playerId=sql.Literal(player.getPlayerID()),
-                 matchId=sql.Literal(match.getMatchID()),
-                 amount=sql.Literal(amount)))
-
-    return sendQuery(q).Status
+    res = sendPrepared("playerScoredInMatch", (player.getPlayerID(), match.getMatchID(), amount))
+    _bump("Scores")
+    return res.Status
 
 
 def playerDidntScoreInMatch(match: Match, player: Player) -> ReturnValue:
-    q = (sql.SQL("DELETE FROM Scores WHERE  matchId = {matchId} AND playerId = {playerId};")
-         .format(matchId=sql.Literal(match.getMatchID()), playerId=sql.Literal(player.getPlayerID())))
-
-    res = sendQuery(q)
+    res = sendPrepared("playerDidntScoreInMatch", (match.getMatchID(), player.getPlayerID()))
+    _bump("Scores")
     if res.Status == ReturnValue.OK and res.RowsAffected == 0:
         return ReturnValue.NOT_EXISTS
 
@@ -420,19 +1198,14 @@ def playerDidntScoreInMatch(match: Match, player: Player) -> ReturnValue:
 
 
 def matchInStadium(match: Match, stadium: Stadium, attendance: int) -> ReturnValue:
-    q = (sql.SQL("INSERT INTO MatchInStadium (matchId, stadiumId, attendance) VALUES ({matchId}, {stadiumId}, {attendance});")
-         .format(matchId=sql.Literal(match.getMatchID()),
-                 stadiumId=sql.Literal(stadium.getStadiumID()),
-                 attendance=sql.Literal(attendance)))
-    return sendQuery(q).Status
+    res = sendPrepared("matchInStadium", (match.getMatchID(), stadium.getStadiumID(), attendance))
+    _bump("MatchInStadium")
+    return res.Status
 
 
 def matchNotInStadium(match: Match, stadium: Stadium) -> ReturnValue:
-    q = (sql.SQL("DELETE FROM MatchInStadium WHERE matchId = {matchId} AND stadiumId = {stadiumId};")
-         .format(matchId=sql.Literal(match.getMatchID()),
-                 stadiumId=sql.Literal(stadium.getStadiumID())))
-
-    res = sendQuery(q)
+    res = sendPrepared("matchNotInStadium", (match.getMatchID(), stadium.getStadiumID()))
+    _bump("MatchInStadium")
     if res.Status == ReturnValue.OK and res.RowsAffected == 0:
         return ReturnValue.NOT_EXISTS
 
@@ -440,9 +1213,7 @@ def matchNotInStadium(match: Match, stadium: Stadium) -> ReturnValue:
 
 
 def averageAttendanceInStadium(stadiumID: int) -> float:
-    q = sql.SQL("SELECT COALESCE(AVG(attendance), 0) FROM MatchInStadium WHERE stadiumId = {x}").format(x=sql.Literal(stadiumID))
-
-    res = sendQuery(q)
+    res = sendPrepared("averageAttendanceInStadium", (stadiumID,))
     if res.Status != ReturnValue.OK:
         return -1
 
@@ -454,10 +1225,7 @@ def averageAttendanceInStadium(stadiumID: int) -> float:
 
 
 def stadiumTotalGoals(stadiumID: int) -> int:
-    q = (sql.SQL("SELECT COALESCE(SUM(amount), 0) FROM matchInStadium LEFT JOIN scores ON matchInStadium.matchId = scores.matchId AND matchInStadium.stadiumId = {x}")
-         .format(x=sql.Literal(stadiumID)))
-
-    res = sendQuery(q)
+    res = sendPrepared("stadiumTotalGoals", (stadiumID,))
     if res.Status != ReturnValue.OK:
         return -1
 
@@ -469,11 +1237,7 @@ def stadiumTotalGoals(stadiumID: int) -> int:
 
 
 def playerIsWinner(playerID: int, matchID: int) -> bool:
-    q = (sql.SQL("SELECT amount FROM personalStats WHERE playerId = {playerID} AND matchID = {matchID}"
-                 " UNION ALL SELECT goals AS amount FROM goalsPerMatch WHERE matchID = {matchID}")
-         .format(playerID=sql.Literal(playerID), matchID=sql.Literal(matchID)))
-
-    res = sendQuery(q)
+    res = sendPrepared("playerIsWinner", (playerID, matchID))
 
     if res.Status != ReturnValue.OK or res.RowsAffected < 2:
         return False
@@ -484,73 +1248,29 @@ def playerIsWinner(playerID: int, matchID: int) -> bool:
 
 
 def getActiveTallTeams() -> List[int]:
-    q = "SELECT * FROM activeTallTeams ORDER BY teamId DESC LIMIT 5"
-    teams = []
-
-    res = sendQuery(q)
-
-    if res.Status != ReturnValue.OK:
-        return teams
-
-    for row in res.Set.rows:
-        teams.append(row[0])
-
-    return teams
+    return _getCached("getActiveTallTeams")
 
 
 def getActiveTallRichTeams() -> List[int]:
-    q = "SELECT teamId FROM activeTallTeams INTERSECT SELECT teamId FROM Stadiums WHERE capacity > 55000 ORDER BY teamId ASC LIMIT 5"
-    teams = []
-
-    res = sendQuery(q)
-
-    if res.Status != ReturnValue.OK:
-        return teams
-
-    for row in res.Set.rows:
-        teams.append(row[0])
-
-    return teams
+    return _getCached("getActiveTallRichTeams")
 
 
 def popularTeams() -> List[int]:
-    teams = []
-    q = ("SELECT teamId FROM "
-         "(SELECT Teams.teamId AS teamId, attendance FROM Teams LEFT JOIN minAttendancePerTeam ON Teams.teamId = minAttendancePerTeam.teamId) t"
-         " WHERE attendance > 40000 OR attendance IS NULL ORDER BY teamId DESC LIMIT 10")
-    res = sendQuery(q)
-
-    if res.Status != ReturnValue.OK:
-        return teams
-
-    for row in res.Set.rows:
-        teams.append(row[0])
-
-    return teams
+    return _getCached("popularTeams")
 # endregion
 
 # region Advanced API
 def getMostAttractiveStadiums() -> List[int]:
-    stadiums = []
-    q = ("SELECT Stadiums.stadiumId AS stadiumId, COALESCE(goals, 0) AS goals FROM Stadiums "
-         "LEFT JOIN goalsPerStadium ON Stadiums.stadiumId = goalsPerStadium.stadiumId "
-         "ORDER BY goals DESC, stadiumId ASC;")
-    res = sendQuery(q)
-
-    if res.Status != ReturnValue.OK:
-        return stadiums
+    return _getCached("getMostAttractiveStadiums")
 
-    for row in res.Set.rows:
-        stadiums.append(row[0])
 
-    return stadiums
+def mostGoalsForTeam(teamID: int) -> List[int]:
+    return _getCached("mostGoalsForTeam", (teamID,))
 
 
-def mostGoalsForTeam(teamID: int) -> List[int]:
+def getClosePlayers(playerID: int) -> List[int]:
     players = []
-    q = (sql.SQL("SELECT playerId FROM goalsPerPlayer WHERE teamId = {teamId} ORDER BY amount DESC, playerId DESC LIMIT 5")
-         .format(teamId=sql.Literal(teamID)))
-    res = sendQuery(q)
+    res = sendPrepared("getClosePlayers", (playerID,))
 
     if res.Status != ReturnValue.OK:
         return players
@@ -559,24 +1279,39 @@ def mostGoalsForTeam(teamID: int) -> List[int]:
         players.append(row[0])
 
     return players
+# endregion
 
+# region Bulk API
+def addTeams(teamIDs: List[int]) -> List[ReturnValue]:
+    results = _sendBatch("INSERT INTO Teams (teamId) VALUES %s", [(teamID,) for teamID in teamIDs], True)
+    _bump("Teams")
+    return results
 
-def getClosePlayers(playerID: int) -> List[int]:
-    players = []
-    str_nested1 = "SELECT pid1, COUNT(pid1) AS playedTogether FROM friends WHERE pid2 = {playerId} GROUP BY pid1"
-    str_nested2 = "SELECT Players.playerId AS pid, COALESCE(n1.playedTogether, 0) AS playedTogether FROM Players LEFT JOIN (" + str_nested1 + ") n1 ON Players.playerId = n1.pid1"
-    str_q = ("SELECT n2.pid "
-             "FROM (SELECT MAX(n2.playedTogether) AS max FROM (" + str_nested2 + ") n2) n3, (" + str_nested2 + ") n2 "
-             "WHERE n2.pid <> {playerId} AND n2.playedTogether * 2 >= n3.max ORDER BY n2.pid ASC LIMIT 10")
 
-    q = sql.SQL(str_q).format(playerId=sql.Literal(playerID))
-    res = sendQuery(q)
+def addMatches(matches: List[Match]) -> List[ReturnValue]:
+    rows = [(match.getMatchID(), match.getCompetition(), match.getHomeTeamID(), match.getAwayTeamID())
+            for match in matches]
+    results = _sendBatch("INSERT INTO Matches (matchId ,competition, homeTeamId, awayTeamId) VALUES %s", rows, True)
+    _evict(*[("getMatchProfile", match.getMatchID()) for match in matches])
+    _bump("Matches")
+    return results
 
-    if res.Status != ReturnValue.OK:
-        return players
 
-    for row in res.Set.rows:
-        players.append(row[0])
+def addPlayers(players: List[Player]) -> List[ReturnValue]:
+    rows = [(player.getPlayerID(), player.getTeamID(), player.getAge(), player.getHeight(), player.getFoot())
+            for player in players]
+    results = _sendBatch("INSERT INTO players (playerId, teamId, age, height, foot) VALUES %s", rows, True)
+    _evict(*[("getPlayerProfile", player.getPlayerID()) for player in players])
+    _bump("Players")
+    return results
 
-    return players
+
+def recordScores(scores: List[Tuple[Match, Player, int]]) -> List[ReturnValue]:
+    """
+    :param scores: (match, player, amount) tuples, as passed to playerScoredInMatch
+    """
+    rows = [(player.getPlayerID(), match.getMatchID(), amount) for match, player, amount in scores]
+    results = _sendBatch("INSERT INTO Scores (playerId, matchId, amount) VALUES %s", rows)
+    _bump("Scores")
+    return results
 # endregion
@@ -0,0 +1,137 @@
+import random
+import threading
+import time
+import unittest
+import Solution
+from Utility.ReturnValue import ReturnValue
+from Tests.abstractTest import AbstractTest, COMMIT
+from Business.Match import Match
+from Business.Player import Player
+from Business.Stadium import Stadium
+
+'''
+    The trigger maintained goalsPerMatch / goalsPerPlayer / goalsPerStadium / playerPairs tables against a full recount
+'''
+
+RECOUNT = {
+    "goalsPerMatch": ("SELECT matchId, goals FROM goalsPerMatch ORDER BY matchId",
+                      "SELECT matchId, SUM(amount) FROM Scores GROUP BY matchId ORDER BY matchId"),
+    "goalsPerPlayer": ("SELECT playerId, teamId, amount FROM goalsPerPlayer ORDER BY playerId",
+                       "SELECT Players.playerId, teamId, COALESCE(SUM(amount), 0) FROM Players "
+                       "LEFT JOIN Scores ON Players.playerId = Scores.playerId GROUP BY Players.playerId ORDER BY 1"),
+    "goalsPerStadium": ("SELECT stadiumId, goals, matches FROM goalsPerStadium ORDER BY stadiumId",
+                        "SELECT stadiumId, COALESCE(SUM(amount), 0), COUNT(DISTINCT MatchInStadium.matchId) "
+                        "FROM MatchInStadium LEFT JOIN Scores ON MatchInStadium.matchId = Scores.matchId "
+                        "GROUP BY stadiumId ORDER BY stadiumId"),
+    "playerPairs": ("SELECT pid1, pid2, together FROM playerPairs ORDER BY pid1, pid2",
+                    "SELECT a.playerId, b.playerId, COUNT(*) FROM Scores a JOIN Scores b "
+                    "ON a.matchId = b.matchId AND a.playerId <= b.playerId GROUP BY 1, 2 ORDER BY 1, 2"),
+}
+
+# getClosePlayers as it was written against Scores directly
+CLOSE_PLAYERS = "SELECT playerId FROM Players WHERE playerId <> {id} AND " \
+                "(SELECT COUNT(*) FROM Scores s WHERE s.playerId = {id}) <= 2 * " \
+                "(SELECT COUNT(*) FROM Scores s JOIN Scores t ON s.matchId = t.matchId " \
+                "WHERE s.playerId = {id} AND t.playerId = Players.playerId) ORDER BY playerId LIMIT 10"
+
+
+# through Solution, so the rows of the test's own transaction are seen
+def _assertConsistent(test):
+    for name, (stored, recount) in RECOUNT.items():
+        test.assertEqual(Solution.sendQuery(recount).Set.rows, Solution.sendQuery(stored).Set.rows, name)
+
+
+class Test(AbstractTest):
+
+    def test_random(self) -> None:
+        rnd = random.Random(236363)
+        Solution.addTeams(list(range(1, 7)))
+        Solution.addPlayers([Player(playerID, rnd.randint(1, 6), 20, 185, "Left") for playerID in range(1, 31)])
+        for stadiumID in range(1, 5):
+            Solution.addStadium(Stadium(stadiumID, 1000, stadiumID))
+
+        for step in range(300):
+            matchID, playerID, stadiumID = rnd.randint(1, 15), rnd.randint(1, 30), rnd.randint(1, 4)
+            action = rnd.random()
+            if action < 0.15:
+                home, away = rnd.sample(range(1, 7), 2)
+                Solution.addMatch(Match(matchID, "Domestic", home, away))
+            elif action < 0.55:
+                Solution.playerScoredInMatch(Match(matchID), Player(playerID), rnd.randint(1, 3))
+            elif action < 0.70:
+                Solution.playerDidntScoreInMatch(Match(matchID), Player(playerID))
+            elif action < 0.82:
+                Solution.matchInStadium(Match(matchID), Stadium(stadiumID), 100)
+            elif action < 0.90:
+                Solution.matchNotInStadium(Match(matchID), Stadium(stadiumID))
+            elif action < 0.96:
+                Solution.deleteMatch(Match(matchID))
+            else:
+                Solution.deletePlayer(Player(playerID))
+                Solution.addPlayer(Player(playerID, rnd.randint(1, 6), 20, 185, "Left"))
+        _assertConsistent(self)
+
+        for playerID in range(1, 32):
+            expected = [row[0] for row in Solution.sendQuery(CLOSE_PLAYERS.format(id=playerID)).Set.rows]
+            self.assertEqual(expected, Solution.getClosePlayers(playerID), playerID)
+
+    def test_deleteMatchCascade(self) -> None:
+        Solution.addTeams([1, 2])
+        Solution.addPlayers([Player(1, 1, 20, 185, "Left"), Player(2, 2, 20, 185, "Left")])
+        Solution.addStadium(Stadium(1, 1000, 1))
+        Solution.addMatches([Match(1, "Domestic", 1, 2), Match(2, "Domestic", 2, 1)])
+        Solution.matchInStadium(Match(1), Stadium(1), 100)
+        Solution.matchInStadium(Match(2), Stadium(1), 100)
+        Solution.recordScores([(Match(1), Player(1), 2), (Match(1), Player(2), 3), (Match(2), Player(2), 1)])
+        self.assertEqual(6, Solution.stadiumTotalGoals(1))
+
+        self.assertEqual(ReturnValue.OK, Solution.deleteMatch(Match(1)))
+        self.assertEqual(1, Solution.stadiumTotalGoals(1))
+        self.assertEqual([2, 1], Solution.mostGoalsForTeam(2) + Solution.mostGoalsForTeam(1))
+        _assertConsistent(self)
+
+
+
+class ConcurrentTest(AbstractTest):
+    # the writers are separate connections, they only see each other's committed rows
+    isolation = COMMIT
+
+    def setUp(self) -> None:
+        super().setUp()
+        Solution.addTeams([1, 2])
+        Solution.addPlayers([Player(1, 1, 20, 185, "Left"), Player(2, 2, 20, 185, "Left")])
+        Solution.addStadium(Stadium(1, 1000, 1))
+        Solution.addMatch(Match(1, "Domestic", 1, 2))
+
+    # first runs in a transaction that is still open while second runs on another connection, in another thread
+    def _concurrently(self, first, second):
+        with Solution.transaction():
+            self.assertEqual(ReturnValue.OK, first())
+            results = []
+            writer = threading.Thread(target=lambda: results.append(second()))
+            writer.start()
+            # the second writer is blocked on the match until the first commits
+            time.sleep(0.2)
+        writer.join()
+        self.assertEqual([ReturnValue.OK], results)
+        _assertConsistent(self)
+
+    def test_stadiumAndScore(self) -> None:
+        self._concurrently(lambda: Solution.matchInStadium(Match(1), Stadium(1), 500),
+                           lambda: Solution.playerScoredInMatch(Match(1), Player(1), 4))
+        self.assertEqual(4, Solution.stadiumTotalGoals(1))
+
+    def test_scoreAndStadium(self) -> None:
+        self._concurrently(lambda: Solution.playerScoredInMatch(Match(1), Player(1), 4),
+                           lambda: Solution.matchInStadium(Match(1), Stadium(1), 500))
+        self.assertEqual(4, Solution.stadiumTotalGoals(1))
+
+
+    def test_twoScorers(self) -> None:
+        self._concurrently(lambda: Solution.playerScoredInMatch(Match(1), Player(1), 2),
+                           lambda: Solution.playerScoredInMatch(Match(1), Player(2), 3))
+        self.assertEqual([2], Solution.getClosePlayers(1))
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2, exit=False)
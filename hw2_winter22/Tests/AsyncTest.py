@@ -0,0 +1,80 @@
+import asyncio
+import unittest
+import AsyncSolution
+import Solution
+import Utility.DBConnector as Connector
+from Utility.ReturnValue import ReturnValue
+from Business.Match import Match
+from Business.Player import Player
+from Business.Stadium import Stadium
+
+'''
+    AsyncSolution returns what Solution returns
+'''
+
+
+class Test(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self) -> None:
+        await AsyncSolution.createTables()
+
+    async def asyncTearDown(self) -> None:
+        await AsyncSolution.clearTables()
+        await AsyncSolution.dropTables()
+        await AsyncSolution.closePool()
+
+    async def test_crud(self) -> None:
+        self.assertEqual([ReturnValue.OK] * 2, await AsyncSolution.addTeams([1, 2]))
+        self.assertEqual(ReturnValue.ALREADY_EXISTS, await AsyncSolution.addTeam(1))
+        self.assertEqual(ReturnValue.BAD_PARAMS, await AsyncSolution.addPlayer(Player(1, 3, 20, 185, "Left")))
+        self.assertEqual(ReturnValue.BAD_PARAMS, await AsyncSolution.addPlayer(Player(1, 1, 20, 185, "Middle")))
+        self.assertEqual(ReturnValue.OK, await AsyncSolution.addPlayer(Player(1, 1, 20, 185, "Left")))
+        self.assertEqual(185, (await AsyncSolution.getPlayerProfile(1)).getHeight())
+        self.assertEqual(185, Solution.getPlayerProfile(1).getHeight())
+
+        self.assertEqual(ReturnValue.OK, await AsyncSolution.addMatch(Match(1, "Domestic", 1, 2)))
+        self.assertEqual(ReturnValue.OK, await AsyncSolution.addStadium(Stadium(1, 1000, 1)))
+        self.assertEqual(ReturnValue.OK, await AsyncSolution.matchInStadium(Match(1), Stadium(1), 100))
+        self.assertEqual(ReturnValue.OK, await AsyncSolution.playerScoredInMatch(Match(1), Player(1), 3))
+        self.assertEqual(3, await AsyncSolution.stadiumTotalGoals(1))
+        self.assertTrue(await AsyncSolution.playerIsWinner(1, 1))
+        self.assertEqual([1], await AsyncSolution.mostGoalsForTeam(1))
+
+        self.assertEqual(ReturnValue.OK, await AsyncSolution.deleteMatch(Match(1)))
+        self.assertEqual(ReturnValue.NOT_EXISTS, await AsyncSolution.deleteMatch(Match(1)))
+        self.assertIsNone((await AsyncSolution.getMatchProfile(1)).getMatchID())
+        self.assertEqual(0, await AsyncSolution.stadiumTotalGoals(1))
+
+    async def test_concurrent(self) -> None:
+        await AsyncSolution.addTeams([1, 2])
+        results = await asyncio.gather(*[AsyncSolution.addPlayer(Player(playerID, 1, 20, 185, "Left"))
+                                         for playerID in range(1, 51)])
+        self.assertEqual([ReturnValue.OK] * 50, results)
+        profiles = await asyncio.gather(*[AsyncSolution.getPlayerProfile(playerID) for playerID in range(1, 51)])
+        self.assertEqual(list(range(1, 51)), [player.getPlayerID() for player in profiles])
+        self.assertEqual(list(range(2, 12)), await AsyncSolution.getClosePlayers(1))
+
+    async def test_configureSchema(self) -> None:
+        self.assertEqual(ReturnValue.OK, await AsyncSolution.addTeam(1))
+        # the parallel runner's workers already work in a schema of their own
+        schema = Connector.getSchema()
+        Connector.configureSchema("async_schema_test")
+        try:
+            await AsyncSolution.createTables()
+            self.assertEqual(ReturnValue.OK, await AsyncSolution.addTeam(1), "The pool should follow the schema")
+            self.assertEqual(ReturnValue.OK, Solution.sendQuery("DROP SCHEMA async_schema_test CASCADE").Status)
+        finally:
+            Connector.configureSchema(schema)
+        self.assertEqual(ReturnValue.ALREADY_EXISTS, await AsyncSolution.addTeam(1))
+
+    async def test_transaction(self) -> None:
+        with self.assertRaises(ZeroDivisionError):
+            async with AsyncSolution.transaction():
+                self.assertEqual(ReturnValue.OK, await AsyncSolution.addTeam(1))
+                self.assertEqual(ReturnValue.ALREADY_EXISTS, await AsyncSolution.addTeam(1))
+                1 / 0
+        self.assertEqual(ReturnValue.OK, await AsyncSolution.addTeam(1), "Team 1 should have been rolled back")
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2, exit=False)
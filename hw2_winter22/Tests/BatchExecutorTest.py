@@ -0,0 +1,47 @@
+import time
+import unittest
+import Solution
+from concurrent.futures import TimeoutError
+from Utility.BatchExecutor import BatchExecutor
+from Tests.abstractTest import AbstractTest, TEMPLATE
+from Business.Player import Player
+
+'''
+    BatchExecutor tests
+'''
+
+
+class Test(AbstractTest):
+    # the calls run on other threads and connections, they only see committed rows
+    isolation = TEMPLATE
+
+    def test_resultsInOrder(self) -> None:
+        Solution.addTeams([1, 2, 3])
+        Solution.addPlayers([Player(playerID, playerID % 3 + 1, 20, 185, "Left") for playerID in range(1, 10)])
+        with BatchExecutor() as executor:
+            report = executor.run([(Solution.popularTeams,)] + [(Solution.getClosePlayers, i) for i in range(1, 10)])
+        self.assertEqual([None] * 10, [result.error for result in report.results])
+        self.assertEqual([3, 2, 1], report.results[0].value)
+        self.assertEqual([Solution.getClosePlayers(i) for i in range(1, 10)],
+                         [result.value for result in report.results[1:]])
+
+    def test_parallel(self) -> None:
+        with BatchExecutor(workers=4) as executor:
+            report = executor.run([(time.sleep, 0.1)] * 4)
+        self.assertLess(report.wallSeconds, 0.3, "Calls should overlap")
+        self.assertGreaterEqual(report.callSeconds, 0.4)
+        self.assertGreaterEqual(report.slowestSeconds, 0.1)
+
+    def test_timeoutAndErrors(self) -> None:
+        with BatchExecutor(workers=2, timeout=0.05) as executor:
+            report = executor.run([(time.sleep, 0.3), {"call": (time.sleep, 0.1), "timeout": 1}, (int, "x")])
+        self.assertIsInstance(report.results[0].error, TimeoutError)
+        self.assertIsNone(report.results[1].error, "Per call timeout should override the default")
+        self.assertIsInstance(report.results[2].error, ValueError)
+        with BatchExecutor(workers=2) as executor:
+            self.assertEqual([1, 2], executor.map(int, [("1",), ("2",)]))
+            self.assertRaises(ValueError, executor.map, int, [("x",)])
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2, exit=False)
@@ -0,0 +1,45 @@
+import os
+import unittest
+import Solution
+from Utility.ReturnValue import ReturnValue
+from Benchmarks import suite
+from Tests.abstractTest import AbstractTest, COMMIT
+
+'''
+    The benchmark suite measures what it claims to
+'''
+
+
+class Test(AbstractTest):
+    # measure() closes the pool, and nothing is cached inside a transaction
+    isolation = COMMIT
+
+    def test_coldRankings(self) -> None:
+        Solution.addTeams([1, 2])
+        Solution.popularTeams()
+        Solution.ResultCache.resetStats()
+        timings = suite.measure([Solution.popularTeams] * 3, coldRuns=2)
+        self.assertEqual(2, timings["cold"]["count"])
+        self.assertEqual(2, Solution.ResultCache.misses, "Cold runs should reach the database")
+        self.assertEqual(1, Solution.ResultCache.hits, "Warm runs may use the cache")
+
+    def test_uncached(self) -> None:
+        Solution.addTeams([1, 2])
+        Solution.ResultCache.resetStats()
+        timings = suite.measure([Solution.popularTeams] * 3, coldRuns=1, repeatable=True)
+        self.assertEqual(2, timings["uncached"]["count"])
+        self.assertEqual(3, Solution.ResultCache.misses, "Uncached runs should reach the database")
+        self.assertNotIn("uncached", suite.measure([Solution.popularTeams] * 3, coldRuns=1))
+
+    def test_benchmarkSchema(self) -> None:
+        Solution.addTeams([1])
+        schema = "benchmark_test_" + str(os.getpid())
+        with suite.benchmarkSchema(schema):
+            self.assertEqual(ReturnValue.OK, Solution.addTeam(1), "The benchmark should get tables of its own")
+        self.assertEqual(ReturnValue.ALREADY_EXISTS, Solution.addTeam(1))
+        res = Solution.sendQuery("SELECT 1 FROM pg_namespace WHERE nspname = '" + schema + "'")
+        self.assertEqual(0, res.RowsAffected, "The benchmark schema should be dropped")
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2, exit=False)
@@ -0,0 +1,63 @@
+import unittest
+import Solution
+from Utility.ReturnValue import ReturnValue
+from Tests.abstractTest import AbstractTest
+from Business.Match import Match
+from Business.Player import Player
+
+'''
+    Bulk insert API tests
+'''
+
+
+class Test(AbstractTest):
+
+    def test_allRowsOk(self) -> None:
+        self.assertEqual([ReturnValue.OK] * 3, Solution.addTeams([1, 2, 3]))
+        players = [Player(playerID, 1, 20, 185, "Left") for playerID in range(1, 6)]
+        self.assertEqual([ReturnValue.OK] * 5, Solution.addPlayers(players))
+        self.assertEqual([ReturnValue.OK] * 2, Solution.addMatches([Match(1, "Domestic", 1, 2),
+                                                                   Match(2, "International", 2, 3)]))
+        self.assertEqual([ReturnValue.OK] * 2, Solution.recordScores([(Match(1), players[0], 2),
+                                                                      (Match(1), players[1], 1)]))
+        self.assertEqual(185, Solution.getPlayerProfile(5).getHeight())
+        self.assertEqual(True, Solution.playerIsWinner(1, 1))
+        self.assertEqual([], Solution.addTeams([]))
+
+    def test_badRowsReported(self) -> None:
+        self.assertEqual([ReturnValue.OK, ReturnValue.BAD_PARAMS, ReturnValue.ALREADY_EXISTS, ReturnValue.OK],
+                         Solution.addTeams([1, -2, 1, 2]))
+        self.assertEqual([ReturnValue.OK, ReturnValue.BAD_PARAMS, ReturnValue.BAD_PARAMS, ReturnValue.BAD_PARAMS],
+                         Solution.addPlayers([Player(1, 1, 20, 185, "Left"),
+                                              Player(2, 3, 20, 185, "Left"),
+                                              Player(3, 1, 20, 185, "Lefti like it"),
+                                              Player(4, 1, 20, None, "Left")]))
+        self.assertEqual([ReturnValue.BAD_PARAMS, ReturnValue.OK],
+                         Solution.addMatches([Match(1, "Domestic", 1, 1), Match(2, "Domestic", 1, 2)]))
+        self.assertEqual([ReturnValue.NOT_EXISTS, ReturnValue.OK, ReturnValue.BAD_PARAMS],
+                         Solution.recordScores([(Match(3), Player(1), 1),
+                                                (Match(2), Player(1), 1),
+                                                (Match(2), Player(1), 0)]))
+        # good rows of a failed batch are kept
+        self.assertEqual(ReturnValue.ALREADY_EXISTS, Solution.addTeam(2))
+        self.assertEqual(ReturnValue.NOT_EXISTS, Solution.deletePlayer(Player(2)))
+        self.assertEqual(ReturnValue.OK, Solution.deletePlayer(Player(1)))
+
+    def test_sendQueries(self) -> None:
+        results = Solution.sendQueries(["INSERT INTO Teams (teamId) VALUES (1), (2)",
+                                        "INSERT INTO Teams (teamId) VALUES (1)",
+                                        "INSERT INTO Teams (teamId) VALUES (-1)",
+                                        "DELETE FROM Teams WHERE teamId = 2"])
+        self.assertEqual([ReturnValue.OK, ReturnValue.ALREADY_EXISTS, ReturnValue.BAD_PARAMS, ReturnValue.OK],
+                         [result.Status for result in results])
+        self.assertEqual([2, None, None, 1], [result.RowsAffected for result in results])
+
+        results = Solution.sendQueries(["INSERT INTO Teams (teamId) VALUES (3)",
+                                        "INSERT INTO Teams (teamId) VALUES (1)"], atomic=True)
+        self.assertEqual([ReturnValue.ALREADY_EXISTS] * 2, [result.Status for result in results])
+        self.assertEqual([ReturnValue.OK, ReturnValue.ALREADY_EXISTS], Solution.addTeams([3, 1]),
+                         "Atomic batch should be undone as a whole")
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2, exit=False)
@@ -0,0 +1,49 @@
+import unittest
+import Solution
+from Utility.ReturnValue import ReturnValue
+from Tests.abstractTest import AbstractTest
+from Business.Match import Match
+from Business.Player import Player
+from Business.Stadium import Stadium
+
+'''
+    Business entities: value equality, hashing, repr and decoding rows
+'''
+
+
+class EntityTest(unittest.TestCase):
+
+    def test_equality(self) -> None:
+        self.assertEqual(Player(1, 1, 20, 185, "Left"), Player(1, 1, 20, 185, "Left"))
+        self.assertNotEqual(Player(1, 1, 20, 185, "Left"), Player(1, 1, 20, 185, "Right"))
+        self.assertNotEqual(Match(1), Stadium(1), "Entities of different types are never equal")
+        self.assertEqual(Match.badMatch(), Match())
+        self.assertEqual(hash(Player(1, 1, 20, 185, "Left")), hash(Player(1, 1, 20, 185, "Left")))
+        self.assertEqual(1, len({Stadium(1, 1000, 1), Stadium(1, 1000, 1)}))
+        self.assertEqual("first", {Match(1): "first"}[Match(1)])
+
+    def test_repr(self) -> None:
+        self.assertEqual("Player(playerID=1, teamID=2, age=20, height=185, foot='Left')",
+                         repr(Player(1, 2, 20, 185, "Left")))
+        self.assertEqual("Match(matchID=1, competition='Domestic', homeTeamID=2, awayTeamID=None)",
+                         repr(Match(1, "Domestic", 2)))
+        self.assertEqual("stadiumID=1, capacity=1000, belongs to=2", str(Stadium(1, 1000, 2)))
+
+    def test_slots(self) -> None:
+        with self.assertRaises(AttributeError):
+            Player().nickname = "Leo"
+
+
+class Test(AbstractTest):
+
+    def test_fromRows(self) -> None:
+        matches = [Match(1, "Domestic", 1, 2), Match(2, "International", 2, 1)]
+        self.assertEqual([ReturnValue.OK] * 2, Solution.addTeams([1, 2]))
+        self.assertEqual([ReturnValue.OK] * 2, Solution.addMatches(matches))
+        self.assertEqual(matches, Match.fromRows(Solution.sendQuery("SELECT * FROM Matches ORDER BY matchId").Set))
+        self.assertEqual(matches[1], Solution.getMatchProfile(2))
+        self.assertEqual([], Player.fromRows([]))
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2, exit=False)
@@ -0,0 +1,110 @@
+import unittest
+import Solution
+from Utility.Cache import LRUCache
+from Utility.ReturnValue import ReturnValue
+from Tests.abstractTest import AbstractTest, COMMIT
+from Business.Player import Player
+from Business.Match import Match
+
+'''
+    LRUCache, the profile cache in front of getPlayerProfile / getMatchProfile / getStadiumProfile
+    and the versioned result cache in front of the ranking queries
+'''
+
+
+class LRUCacheTest(unittest.TestCase):
+
+    def test_lru(self) -> None:
+        cache = LRUCache(maxSize=2)
+        cache.put(1, "a")
+        cache.put(2, None)
+        self.assertEqual((True, "a"), cache.get(1))
+        cache.put(3, "c")
+        self.assertEqual((False, None), cache.get(2), "Least recently used entry should be evicted")
+        self.assertEqual((True, "c"), cache.get(3))
+        self.assertEqual({"size": 2, "hits": 2, "misses": 1, "evictions": 1}, cache.stats())
+
+    def test_ttl(self) -> None:
+        cache = LRUCache(ttl=0)
+        cache.put(1, "a")
+        self.assertEqual((False, None), cache.get(1), "Expired entry should miss")
+
+    def test_staleGeneration(self) -> None:
+        cache = LRUCache()
+        generation = cache.generation
+        cache.invalidate(1)
+        cache.put(1, "a", generation)
+        self.assertEqual((False, None), cache.get(1), "Value loaded before an invalidation should be dropped")
+
+
+class Test(AbstractTest):
+    # nothing is cached inside a transaction
+    isolation = COMMIT
+
+    def setUp(self) -> None:
+        super().setUp()
+        Solution.ProfileCache.resetStats()
+        Solution.ResultCache.resetStats()
+
+    def test_hitsAndNegatives(self) -> None:
+        self.assertIsNone(Solution.getPlayerProfile(1).getPlayerID())
+        self.assertIsNone(Solution.getPlayerProfile(1).getPlayerID())
+        self.assertEqual(1, Solution.ProfileCache.hits, "Missing players should be cached too")
+
+        self.assertEqual(ReturnValue.OK, Solution.addTeam(1))
+        self.assertEqual(ReturnValue.OK, Solution.addPlayer(Player(1, 1, 20, 185, "Left")))
+        self.assertEqual(185, Solution.getPlayerProfile(1).getHeight(), "addPlayer should evict the negative entry")
+        self.assertEqual(185, Solution.getPlayerProfile(1).getHeight())
+        self.assertEqual(2, Solution.ProfileCache.hits)
+
+        self.assertEqual(ReturnValue.OK, Solution.deletePlayer(Player(1)))
+        self.assertIsNone(Solution.getPlayerProfile(1).getPlayerID())
+
+    def test_clearTables(self) -> None:
+        Solution.addTeams([1, 2])
+        self.assertEqual(ReturnValue.OK, Solution.addMatch(Match(1, "Domestic", 1, 2)))
+        self.assertEqual(1, Solution.getMatchProfile(1).getHomeTeamID())
+        Solution.clearTables()
+        self.assertIsNone(Solution.getMatchProfile(1).getMatchID())
+
+    def test_rolledBackTransaction(self) -> None:
+        self.assertEqual(ReturnValue.OK, Solution.addTeam(1))
+        with self.assertRaises(ZeroDivisionError):
+            with Solution.transaction():
+                self.assertEqual(ReturnValue.OK, Solution.addPlayer(Player(1, 1, 20, 185, "Left")))
+                self.assertEqual(185, Solution.getPlayerProfile(1).getHeight())
+                1 / 0
+        self.assertIsNone(Solution.getPlayerProfile(1).getPlayerID(),
+                          "Rows read inside a rolled back transaction should not be cached")
+
+    def test_rankingsUntilWrite(self) -> None:
+        Solution.addTeams([1, 2])
+        self.assertEqual([2, 1], Solution.popularTeams())
+        self.assertEqual([2, 1], Solution.popularTeams())
+        self.assertEqual(1, Solution.ResultCache.hits)
+
+        self.assertEqual(ReturnValue.OK, Solution.addTeam(3))
+        self.assertEqual([3, 2, 1], Solution.popularTeams(), "addTeam should make the cached result stale")
+
+        Solution.addPlayers([Player(1, 1, 20, 185, "Left"), Player(2, 1, 20, 185, "Left")])
+        Solution.addMatch(Match(1, "Domestic", 1, 2))
+        Solution.playerScoredInMatch(Match(1), Player(1), 1)
+        self.assertEqual([1, 2], Solution.mostGoalsForTeam(1))
+        Solution.playerScoredInMatch(Match(1), Player(2), 3)
+        self.assertEqual([2, 1], Solution.mostGoalsForTeam(1), "playerScoredInMatch should make it stale")
+        Solution.deleteMatch(Match(1))
+        self.assertEqual([2, 1], Solution.mostGoalsForTeam(1))
+
+    def test_rankingsInTransaction(self) -> None:
+        Solution.addTeams([1, 2])
+        self.assertEqual([2, 1], Solution.popularTeams())
+        with self.assertRaises(ZeroDivisionError):
+            with Solution.transaction():
+                Solution.addTeam(3)
+                self.assertEqual([3, 2, 1], Solution.popularTeams())
+                1 / 0
+        self.assertEqual([2, 1], Solution.popularTeams())
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2, exit=False)
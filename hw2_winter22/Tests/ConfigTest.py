@@ -0,0 +1,60 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from Utility import Config
+from Utility.Exceptions import DatabaseException
+
+'''
+    database.ini loader tests, no database needed
+'''
+
+
+class Test(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.dir = tempfile.TemporaryDirectory()
+        self.ini = os.path.join(self.dir.name, "database.ini")
+        with open(self.ini, "w") as f:
+            f.write("[postgresql]\nhost=example\ndatabase=league\nport=5433\n")
+        Config.clearConfigCache()
+
+    def tearDown(self) -> None:
+        Config.setConfigFile(None)
+        self.dir.cleanup()
+
+    def test_explicitPath(self) -> None:
+        self.assertEqual({"host": "example", "database": "league", "port": "5433"}, Config.loadConfig(self.ini))
+
+    def test_parsedOnce(self) -> None:
+        Config.setConfigFile(self.ini)
+        self.assertEqual("example", Config.loadConfig()["host"])
+        with open(self.ini, "w") as f:
+            f.write("[postgresql]\nhost=changed\n")
+        self.assertEqual("example", Config.loadConfig()["host"], "File should not be read again")
+        Config.clearConfigCache()
+        self.assertEqual("changed", Config.loadConfig()["host"])
+
+    def test_envOverride(self) -> None:
+        with mock.patch.dict(os.environ, {"PGHOST": "override"}):
+            params = Config.loadConfig(self.ini)
+        self.assertEqual("override", params["host"])
+        self.assertEqual("league", params["database"])
+
+    def test_workingDirectory(self) -> None:
+        cwd = os.getcwd()
+        try:
+            os.chdir(self.dir.name)
+            self.assertEqual(Config.DEFAULT_CONFIG_FILE, Config._resolve(None))
+        finally:
+            os.chdir(cwd)
+
+    def test_missingFile(self) -> None:
+        with mock.patch.dict(os.environ, {}, clear=True):
+            self.assertRaises(DatabaseException.database_ini_ERROR, Config.loadConfig,
+                              os.path.join(self.dir.name, "missing.ini"))
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2, exit=False)
@@ -0,0 +1,80 @@
+import threading
+import unittest
+
+import Utility.DBConnector as Connector
+from Utility.ConnectionPool import ConnectionPool
+from Utility.Exceptions import DatabaseException
+
+'''
+    Connection pool tests, they only need a reachable database
+'''
+
+
+class Test(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.pool = ConnectionPool(Connector.DBConnector._connect, minSize=1, maxSize=2, checkoutTimeout=0.2)
+
+    def tearDown(self) -> None:
+        self.pool.closeAll()
+
+    def test_reuse(self) -> None:
+        first = self.pool.getConnection()
+        self.pool.release(first)
+        second = self.pool.getConnection()
+        self.assertIs(first.connection, second.connection, "Idle connection should be reused")
+        self.pool.release(second)
+        self.assertEqual(1, self.pool.size())
+
+    def test_maxSize(self) -> None:
+        first = self.pool.getConnection()
+        second = self.pool.getConnection()
+        self.assertRaises(DatabaseException.ConnectionInvalid, self.pool.getConnection)
+
+        # a waiting checkout is served once a connection is released
+        threading.Timer(0.05, self.pool.release, [first]).start()
+        third = self.pool.getConnection()
+        self.assertIs(first.connection, third.connection)
+        self.pool.release(second)
+        self.pool.release(third)
+        self.assertEqual(2, self.pool.size())
+
+    def test_brokenConnectionReplaced(self) -> None:
+        first = self.pool.getConnection()
+        broken = first.connection
+        self.pool.release(first)
+        broken.close()
+        second = self.pool.getConnection()
+        self.assertIsNot(broken, second.connection, "Broken connection should be replaced")
+        self.assertFalse(second.connection.closed)
+        self.pool.release(second)
+        self.assertEqual(1, self.pool.size())
+
+    def test_releaseRollsBack(self) -> None:
+        pooled = self.pool.getConnection()
+        with pooled.connection.cursor() as cursor:
+            cursor.execute("SELECT 1")
+        self.pool.release(pooled)
+        pooled = self.pool.getConnection()
+        self.assertEqual(0, pooled.connection.get_transaction_status())
+        self.pool.release(pooled)
+
+    def test_idleTimeout(self) -> None:
+        self.pool.idleTimeout = 0
+        first = self.pool.getConnection()
+        second = self.pool.getConnection()
+        self.pool.release(first)
+        self.pool.release(second)
+        self.assertEqual(self.pool.minSize, self.pool.size(), "Idle connections above minSize should be closed")
+
+    def test_sharedPool(self) -> None:
+        connector = Connector.DBConnector()
+        connection = connector.connection
+        connector.close()
+        connector = Connector.DBConnector()
+        self.assertIs(connection, connector.connection, "DBConnector should borrow from the shared pool")
+        connector.close()
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2, exit=False)
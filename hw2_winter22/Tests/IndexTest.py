@@ -0,0 +1,72 @@
+import unittest
+from unittest import mock
+import Solution
+from Tests.abstractTest import AbstractTest
+
+'''
+    The secondary, covering and partial indexes generated from the table definitions
+'''
+
+
+class Test(AbstractTest):
+
+    def _plan(self, name, *params) -> str:
+        query = Solution.Statements[name]["query"]
+        for index in reversed(range(len(params))):
+            query = query.replace("$" + str(index + 1), str(params[index]))
+        return "\n".join(row[0] for row in Solution.sendQuery("EXPLAIN " + query).Set.rows)
+
+    def _assertGenerated(self, relations) -> None:
+        res = Solution.sendQuery("SELECT indexname, indexdef FROM pg_indexes WHERE schemaname = current_schema()")
+        definitions = dict(res.Set.rows)
+        for relation in relations:
+            for index in relation["indexes"]:
+                name = Solution._indexName(relation["name"], index).lower()
+                self.assertIn(name, definitions)
+                self.assertEqual(index["include"] is not None, " INCLUDE " in definitions[name], name)
+                self.assertEqual(index["where"] is not None, " WHERE " in definitions[name], name)
+                self.assertEqual(index["unique"], definitions[name].startswith("CREATE UNIQUE"), name)
+            if relation.get("uniqueKey") is not None:
+                self.assertIn((relation["name"] + "_key").lower(), definitions)
+
+    def test_generated(self) -> None:
+        self._assertGenerated(Solution.Tables)
+
+    def test_materializedViews(self) -> None:
+        Solution.MaterializeViews = True
+        try:
+            Solution.createTables()
+            self._assertGenerated(Solution.Tables + Solution.Views)
+        finally:
+            Solution.MaterializeViews = False
+
+    def test_changed(self) -> None:
+        defineTables = Solution.defineTables
+        old = Solution._indexName("Players", Solution._createIndex("teamId")).lower()
+
+        def changed():
+            defineTables()
+            Solution.Tables[1]["indexes"][0] = Solution._createIndex("teamId, age")
+        with mock.patch.object(Solution, "defineTables", changed):
+            Solution.createTables()
+            self._assertGenerated(Solution.Tables)
+        res = Solution.sendQuery("SELECT 1 FROM pg_indexes WHERE schemaname = current_schema() AND indexname = '"
+                                 + old + "'")
+        self.assertEqual(0, res.RowsAffected, "An index no longer defined should be dropped")
+
+    def test_used(self) -> None:
+        # the tables are empty, without this the planner would rather scan them
+        Solution.sendQuery("SET LOCAL enable_seqscan = off")
+        Solution.sendQuery("SET LOCAL enable_bitmapscan = off")
+        self.assertIn("Index Only Scan using " + self._name("MatchInStadium"), self._plan("averageAttendanceInStadium", 1))
+        self.assertIn(self._name("goalsPerPlayer"), self._plan("mostGoalsForTeam", 1))
+        self.assertIn(self._name("playerPairs"), self._plan("getClosePlayers", 1))
+
+    # the name of the first index generated for the table
+    def _name(self, table) -> str:
+        relation = next(relation for relation in Solution.Tables if relation["name"] == table)
+        return Solution._indexName(table, relation["indexes"][0]).lower()
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2, exit=False)
@@ -0,0 +1,66 @@
+import json
+import unittest
+import Solution
+import Utility.Instrumentation as Instrumentation
+from Utility.ReturnValue import ReturnValue
+from Tests.abstractTest import AbstractTest, COMMIT
+from Business.Player import Player
+
+'''
+    Instrumentation of DBConnector, tagged by Solution function
+'''
+
+
+class Test(AbstractTest):
+    # counts the commits and connections of each call
+    isolation = COMMIT
+
+    def setUp(self) -> None:
+        super().setUp()
+        Instrumentation.reset()
+
+    def tearDown(self) -> None:
+        Instrumentation.disable()
+        Instrumentation.reset()
+        super().tearDown()
+
+    def test_disabled(self) -> None:
+        Solution.addTeam(1)
+        self.assertEqual({}, Instrumentation.stats())
+
+    def test_phasesByFunction(self) -> None:
+        Instrumentation.enable()
+        self.assertEqual(ReturnValue.OK, Solution.addTeam(1))
+        self.assertEqual(ReturnValue.OK, Solution.addPlayer(Player(1, 1, 20, 185, "Left")))
+        Solution.ProfileCache.clear()
+        Solution.getPlayerProfile(1)
+
+        stats = Instrumentation.stats()
+        self.assertEqual({"connect", "execute", "commit"}, set(stats["addTeam"]["phases"]) - {"prepare"})
+        profile = stats["getPlayerProfile"]
+        self.assertEqual(1, profile["rows"])
+        self.assertEqual(1, profile["phases"]["fetch"]["count"])
+        self.assertGreaterEqual(profile["roundTrips"], 2, "EXECUTE and COMMIT at least")
+        self.assertEqual(1, sum(profile["phases"]["execute"]["histogram"].values()))
+        self.assertEqual([], Instrumentation.slowQueries(), "No threshold, no slow query log")
+
+    def test_slowQueryLog(self) -> None:
+        Solution.addTeam(1)
+        Solution.addPlayer(Player(1, 1, 20, 185, "Left"))
+        Solution.ProfileCache.clear()
+        Instrumentation.enable(slowThresholdSeconds=0, explain=True)
+        Solution.getPlayerProfile(1)
+
+        slow = [entry for entry in Instrumentation.slowQueries() if entry["tag"] == "getPlayerProfile"]
+        self.assertEqual(1, len(slow))
+        self.assertEqual(["1"], slow[0]["params"])
+        self.assertTrue(any("Execution Time" in line for line in slow[0]["plan"]), slow[0]["plan"])
+        self.assertEqual(185, Solution.getPlayerProfile(1).getHeight())
+
+        dump = json.loads(Instrumentation.dumpJson())
+        self.assertIn("getPlayerProfile", dump["stats"])
+        self.assertEqual(len(Instrumentation.slowQueries()), len(dump["slowQueries"]))
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2, exit=False)
@@ -0,0 +1,65 @@
+import unittest
+import Solution
+from Utility.ReturnValue import ReturnValue
+from Tests import SimpleTest
+from Business.Match import Match
+from Business.Player import Player
+from Business.Stadium import Stadium
+
+'''
+    SimpleTest again, with the analytic views materialized
+'''
+
+
+class Test(SimpleTest.Test):
+
+    def setUp(self) -> None:
+        Solution.MaterializeViews = True
+        super().setUp()
+
+    def tearDown(self) -> None:
+        super().tearDown()
+        Solution.MaterializeViews = False
+
+    def _stale(self, view) -> bool:
+        res = Solution.sendQuery("SELECT stale FROM ViewRefreshState WHERE name = '" + view.lower() + "'")
+        self.assertEqual(1, res.RowsAffected, view)
+        return res.Set.rows[0][0]
+
+    def test_refreshAfterWrite(self) -> None:
+        self.assertEqual(ReturnValue.OK, Solution.addTeam(1))
+        self.assertEqual(ReturnValue.OK, Solution.addTeam(2))
+        self.assertEqual(ReturnValue.OK, Solution.addPlayer(Player(1, 1, 20, 195, "Left")))
+        self.assertEqual(ReturnValue.OK, Solution.addPlayer(Player(2, 1, 20, 195, "Left")))
+        self.assertEqual(ReturnValue.OK, Solution.addMatch(Match(1, "Domestic", 1, 2)))
+        self.assertEqual([1], Solution.getActiveTallTeams())
+        self.assertFalse(self._stale("activeTallTeams"))
+
+        self.assertEqual(ReturnValue.OK, Solution.addPlayer(Player(3, 2, 20, 195, "Left")))
+        self.assertEqual(ReturnValue.OK, Solution.addPlayer(Player(4, 2, 20, 195, "Left")))
+        self.assertTrue(self._stale("tallTeams"), "A write should mark the views reading its table stale")
+        self.assertTrue(self._stale("activeTallTeams"))
+        self.assertEqual([2, 1], Solution.getActiveTallTeams(), "Stale view should be refreshed on read")
+        self.assertFalse(self._stale("tallTeams"))
+        self.assertFalse(self._stale("activeTallTeams"))
+
+        with Solution.transaction():
+            self.assertEqual(ReturnValue.OK, Solution.deletePlayer(Player(3)))
+            self.assertEqual([1], Solution.getActiveTallTeams(), "Reads see writes of their transaction")
+
+    def test_clearTables(self) -> None:
+        self.assertEqual(ReturnValue.OK, Solution.addTeam(1))
+        self.assertEqual(ReturnValue.OK, Solution.addPlayer(Player(1, 1, 20, 185, "Left")))
+        self.assertEqual(ReturnValue.OK, Solution.addStadium(Stadium(1, 1000, 1)))
+        self.assertEqual([1], Solution.popularTeams())
+
+        Solution.clearTables()
+        self.assertEqual(0, Solution.sendQuery("SELECT * FROM goalsPerPlayer").RowsAffected)
+        self.assertEqual(0, Solution.sendQuery("SELECT * FROM ViewRefreshState WHERE stale").RowsAffected,
+                         "The views should be refreshed by clearTables")
+        self.assertEqual(0, Solution.sendQuery("SELECT * FROM activeTeams").RowsAffected)
+        self.assertEqual([], Solution.popularTeams())
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2, exit=False)
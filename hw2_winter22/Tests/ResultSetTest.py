@@ -0,0 +1,101 @@
+import unittest
+
+import Utility.DBConnector as Connector
+from Utility.DBConnector import ResultSet
+
+'''
+    ResultSet tests, they only need a reachable database
+'''
+
+
+class Test(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.connector = Connector.DBConnector()
+
+    def tearDown(self) -> None:
+        self.connector.close()
+
+    def test_eager(self) -> None:
+        rows, result = self.connector.execute("SELECT n AS ID, n * 2 AS double FROM generate_series(1, 3) n")
+        self.assertEqual(3, rows)
+        self.assertEqual(3, result.size())
+        self.assertEqual(2, result[1]["id"])
+        self.assertEqual(6, result[2]["DOUBLE"])
+        self.assertEqual(True, ResultSet().isEmpty())
+
+    def test_row(self) -> None:
+        _, result = self.connector.execute("SELECT 7 AS playerId, 'Left' AS foot")
+        row = result[0]
+        self.assertEqual(7, row[0])
+        self.assertEqual(7, row["playerid"])
+        self.assertEqual(7, row["PlayerID"])
+        self.assertEqual("Left", row[1])
+        self.assertEqual(["playerid", "foot"], list(row), "Iterating a row gives its column names")
+        self.assertEqual({"playerid": 7, "foot": "Left"}, dict(row.items()))
+        self.assertEqual(None, row[None])
+        self.assertRaises(KeyError, lambda: row["age"])
+        self.assertIs(type(row), type(next(iter(result))), "One row type per column header")
+        self.assertEqual(0, len(result[1]), "Invalid row gives an empty row")
+
+    def test_columns(self) -> None:
+        query = ("SELECT n AS id, n / 2.0 AS half, 'p' || n AS name, NULLIF(n, 2) AS maybe "
+                 "FROM generate_series(1, 3) n")
+        _, result = self.connector.execute(query)
+        columns = result.toColumns()
+        self.assertEqual([1, 2, 3], columns["id"])
+        self.assertEqual(["p1", "p2", "p3"], columns["name"])
+        self.assertEqual([1, None, 3], columns["maybe"])
+
+        try:
+            import numpy
+        except ImportError:
+            self.skipTest("numpy is not installed")
+
+        arrays = result.toNumpy()
+        self.assertEqual("int64", arrays["id"].dtype)
+        self.assertEqual("float64", arrays["half"].dtype)
+        self.assertEqual(object, arrays["name"].dtype)
+        self.assertEqual("float64", arrays["maybe"].dtype, "NULLs in an int column give float64")
+        self.assertEqual(6, arrays["id"].sum())
+        self.assertEqual(True, numpy.isnan(arrays["maybe"][1]))
+
+        _, stream = self.connector.execute(query, stream=True, fetchSize=2)
+        records = stream.toRecords()
+        self.assertEqual(3, len(records))
+        self.assertEqual([1, 2, 3], list(records["id"]))
+        self.assertEqual("p2", records[1]["name"])
+
+        _, result = self.connector.execute("SELECT n AS id FROM generate_series(1, 0) n")
+        self.assertEqual({"id": []}, result.toColumns())
+        self.assertEqual(0, len(result.toNumpy()["id"]))
+
+    def test_stream(self) -> None:
+        rows, result = self.connector.execute("SELECT n, n * 2 AS double FROM generate_series(1, 2500) n",
+                                              stream=True, fetchSize=1000)
+        self.assertEqual(-1, rows)
+        self.assertEqual(["n", "double"], result.cols_header)
+        self.assertEqual(1000, result.rowsFetched, "Only the first batch is fetched up front")
+
+        total = 0
+        for index, row in enumerate(result):
+            self.assertEqual(index + 1, row["n"])
+            total += row["DOUBLE"]
+        self.assertEqual(2500 * 2501, total)
+        self.assertEqual(2500, result.rowsFetched)
+
+    def test_streamBatches(self) -> None:
+        _, result = self.connector.execute("SELECT n FROM generate_series(1, 10) n", stream=True, fetchSize=4)
+        self.assertEqual([4, 4, 2], [len(batch) for batch in result.batches()])
+
+        _, result = self.connector.execute("SELECT n FROM generate_series(1, 0) n", stream=True)
+        self.assertEqual([], list(result))
+
+    def test_streamError(self) -> None:
+        self.assertRaises(Exception, self.connector.execute, "SELECT * FROM noSuchTable", stream=True)
+        self.connector.rollback()
+        self.assertEqual(1, self.connector.execute("SELECT 1")[0])
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2, exit=False)
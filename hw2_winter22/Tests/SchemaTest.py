@@ -0,0 +1,93 @@
+import unittest
+import Solution
+import Utility.DBConnector as Connector
+from Utility.ReturnValue import ReturnValue
+from Tests.abstractTest import AbstractTest, COMMIT
+from Business.Player import Player
+from Utility.Exceptions import DatabaseException
+
+'''
+    createTables is a no-op on a current schema and updates an outdated one without losing its rows, in the
+    configured schema
+'''
+
+
+class Test(AbstractTest):
+
+    def tearDown(self) -> None:
+        Solution.MaterializeViews = False
+        super().tearDown()
+
+    def test_current(self) -> None:
+        self.assertEqual(ReturnValue.OK, Solution.addTeam(1))
+        self.assertEqual(ReturnValue.OK, Solution.addPlayer(Player(1, 1, 20, 185, "Left")))
+        Solution.createTables()
+        self.assertEqual(185, Solution.getPlayerProfile(1).getHeight(), "A current schema should be left alone")
+        self.assertEqual(ReturnValue.ALREADY_EXISTS, Solution.addTeam(1))
+
+    def test_outdated(self) -> None:
+        self.assertEqual(ReturnValue.OK, Solution.addTeam(1))
+        Solution.MaterializeViews = True
+        Solution.createTables()
+        self.assertEqual(ReturnValue.ALREADY_EXISTS, Solution.addTeam(1), "Updating the schema should keep the rows")
+        self.assertEqual([1], Solution.popularTeams())
+
+        Solution.MaterializeViews = False
+        Solution.createTables()
+        self.assertEqual(ReturnValue.ALREADY_EXISTS, Solution.addTeam(1))
+        self.assertEqual([1], Solution.popularTeams())
+
+    def test_changedColumns(self) -> None:
+        self.assertEqual(ReturnValue.OK, Solution.addTeam(1))
+        self.assertEqual(ReturnValue.OK, Solution.sendQuery("ALTER TABLE Teams ADD COLUMN city varchar").Status)
+        self.assertEqual(ReturnValue.OK, Solution.sendQuery("UPDATE SchemaVersion SET hash = 'outdated'").Status)
+        with self.assertRaises(DatabaseException.UNKNOWN_ERROR):
+            Solution.createTables()
+        self.assertEqual(ReturnValue.ALREADY_EXISTS, Solution.addTeam(1), "A table should never be dropped implicitly")
+
+    def test_changedTypesAndConstraints(self) -> None:
+        for change in ["ALTER TABLE Players ALTER COLUMN foot TYPE varchar(16)",
+                       "ALTER TABLE Players DROP CONSTRAINT players_age_check",
+                       "ALTER TABLE Scores DROP CONSTRAINT scores_matchid_fkey"]:
+            with Solution.rolledBack():
+                self.assertEqual(ReturnValue.OK, Solution.sendQuery(change).Status)
+                self.assertEqual(ReturnValue.OK, Solution.sendQuery("UPDATE SchemaVersion SET hash = 'outdated'").Status)
+                with self.assertRaises(DatabaseException.UNKNOWN_ERROR, msg=change):
+                    Solution.createTables()
+
+    def test_failedScript(self) -> None:
+        # a table in the place of a view fails CREATE OR REPLACE VIEW, halfway through the script
+        self.assertEqual(ReturnValue.OK, Solution.sendQuery("DROP VIEW activeTeams CASCADE").Status)
+        self.assertEqual(ReturnValue.OK, Solution.sendQuery("CREATE TABLE activeTeams (teamID int)").Status)
+        self.assertEqual(ReturnValue.OK, Solution.sendQuery("UPDATE SchemaVersion SET hash = 'outdated'").Status)
+        with self.assertRaises(DatabaseException.UNKNOWN_ERROR):
+            Solution.createTables()
+        res = Solution.sendQuery("SELECT hash FROM SchemaVersion")
+        self.assertEqual("outdated", res.Set.rows[0][0], "A failed script should keep nothing")
+
+    def test_dropped(self) -> None:
+        Solution.dropTables()
+        Solution.createTables()
+        self.assertEqual(ReturnValue.OK, Solution.addTeam(1), "A dropped schema should be created again")
+
+
+class OtherSchemaTest(AbstractTest):
+    # switching schemas closes the pool, the connection of a rolled back test included
+    isolation = COMMIT
+
+    def test_configureSchema(self) -> None:
+        self.assertEqual(ReturnValue.OK, Solution.addTeam(1))
+        # the parallel runner's workers already work in a schema of their own
+        schema = Connector.getSchema()
+        Connector.configureSchema("schema_test")
+        try:
+            Solution.createTables()
+            self.assertEqual(ReturnValue.OK, Solution.addTeam(1), "Tables of another schema should be empty")
+            self.assertEqual(ReturnValue.OK, Solution.sendQuery("DROP SCHEMA schema_test CASCADE").Status)
+        finally:
+            Connector.configureSchema(schema)
+        self.assertEqual(ReturnValue.ALREADY_EXISTS, Solution.addTeam(1))
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2, exit=False)
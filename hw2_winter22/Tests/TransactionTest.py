@@ -0,0 +1,52 @@
+import unittest
+import Solution
+from Utility.ReturnValue import ReturnValue
+from Tests.abstractTest import AbstractTest
+from Business.Player import Player
+
+'''
+    Solution.transaction() scope tests
+'''
+
+
+class Test(AbstractTest):
+
+    def test_commitTogether(self) -> None:
+        with Solution.transaction():
+            self.assertEqual(ReturnValue.OK, Solution.addTeam(1))
+            self.assertEqual(ReturnValue.ALREADY_EXISTS, Solution.addTeam(1), "Failing call keeps its ReturnValue")
+            self.assertEqual(ReturnValue.OK, Solution.addPlayer(Player(1, 1, 20, 185, "Left")))
+            self.assertEqual(185, Solution.getPlayerProfile(1).getHeight(), "Calls see earlier calls in the scope")
+        self.assertEqual(185, Solution.getPlayerProfile(1).getHeight())
+
+    def test_rollbackOnException(self) -> None:
+        with self.assertRaises(ZeroDivisionError):
+            with Solution.transaction():
+                self.assertEqual(ReturnValue.OK, Solution.addTeam(1))
+                1 / 0
+        self.assertEqual(ReturnValue.OK, Solution.addTeam(1), "Team 1 should have been rolled back")
+
+    def test_nested(self) -> None:
+        with Solution.transaction():
+            self.assertEqual(ReturnValue.OK, Solution.addTeam(1))
+            with self.assertRaises(ZeroDivisionError):
+                with Solution.transaction():
+                    self.assertEqual(ReturnValue.OK, Solution.addTeam(2))
+                    1 / 0
+            self.assertEqual(ReturnValue.OK, Solution.addTeam(2), "Only the inner scope is rolled back")
+        self.assertEqual([ReturnValue.ALREADY_EXISTS] * 2, Solution.addTeams([1, 2]))
+
+    def test_bulkInScope(self) -> None:
+        with Solution.transaction():
+            self.assertEqual([ReturnValue.OK, ReturnValue.ALREADY_EXISTS], Solution.addTeams([1, 1]))
+            self.assertEqual(ReturnValue.ALREADY_EXISTS, Solution.addTeam(1))
+
+    def test_rolledBack(self) -> None:
+        with Solution.rolledBack():
+            self.assertEqual(ReturnValue.OK, Solution.addTeam(1))
+            self.assertEqual([1], Solution.popularTeams())
+        self.assertEqual(ReturnValue.OK, Solution.addTeam(1), "Team 1 should have been rolled back")
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2, exit=False)
@@ -1,13 +1,106 @@
+import os
 import unittest
+import psycopg2
+from psycopg2 import sql
 import Solution
+import Utility.DBConnector as Connector
+from Utility.Config import loadConfig
+
+'''
+    Test isolation, chosen per test class with the isolation attribute:
+    ROLLBACK    every test runs inside Solution.rolledBack(), so all its calls share one transaction that is
+                rolled back at tearDown. The schema is only built when it is not current (see createTables)
+    COMMIT      calls commit as usual, tearDown clears the tables
+    TEMPLATE    calls commit as usual, in a fresh database cloned for each test from a template database that
+                holds the schema. For tests that need real commits, e.g. reads from other connections.
+                The clone is private to the process, so the schema set by DBConnector.configureSchema is not used
+'''
+
+ROLLBACK = "rollback"
+COMMIT = "commit"
+TEMPLATE = "template"
+
+# the template is built (or checked) once per session
+_templateReady = False
+
+
+def _databaseName() -> str:
+    return loadConfig()["database"]
+
+
+# runs statements that cannot run in a transaction block, like CREATE DATABASE
+def _administer(*queries):
+    connection = psycopg2.connect(**loadConfig())
+    connection.autocommit = True
+    try:
+        with connection.cursor() as cursor:
+            for query in queries:
+                cursor.execute(query)
+            return cursor.fetchall() if cursor.description is not None else None
+    finally:
+        connection.close()
+
+
+def _templateName() -> str:
+    return _databaseName() + "_template"
+
+
+# brings the template database up to date, once per session; the parallel runner calls it before starting
+# its workers, since a database cannot be cloned while someone is connected to it
+def buildTemplate():
+    global _templateReady
+    if _templateReady:
+        return
+    template = _templateName()
+    if not _administer(sql.SQL("SELECT 1 FROM pg_database WHERE datname = {}").format(sql.Literal(template))):
+        _administer(sql.SQL("CREATE DATABASE {}").format(sql.Identifier(template)))
+
+    schema = Connector.getSchema()
+    Connector.configureSchema(None)
+    Connector.configureConnection(database=template)
+    try:
+        Solution.createTables()
+    finally:
+        Connector.configureConnection(database=None)
+        Connector.configureSchema(schema)
+    _templateReady = True
 
 
 class AbstractTest(unittest.TestCase):
+    isolation = ROLLBACK
+
     # before each test, setUp is executed
     def setUp(self) -> None:
-        Solution.createTables()
+        if self.isolation == TEMPLATE:
+            self.__cloneDatabase()
+        else:
+            Solution.createTables()
+        if self.isolation == ROLLBACK:
+            self.__scope = Solution.rolledBack()
+            self.__scope.__enter__()
 
     # after each test, tearDown is executed
+    # the schema is kept, the next createTables finds it current and does nothing
     def tearDown(self) -> None:
-        Solution.clearTables()
-        Solution.dropTables()
+        if self.isolation == ROLLBACK:
+            self.__scope.__exit__(None, None, None)
+        elif self.isolation == COMMIT:
+            Solution.clearTables()
+        else:
+            Connector.configureConnection(database=None)
+            Connector.configureSchema(self.__schema)
+            _administer(sql.SQL("DROP DATABASE IF EXISTS {} WITH (FORCE)").format(sql.Identifier(self.__clone)))
+            Solution._evict()
+            Solution._bump()
+
+    def __cloneDatabase(self):
+        buildTemplate()
+        self.__clone = _databaseName() + "_test_" + str(os.getpid())
+        _administer(sql.SQL("DROP DATABASE IF EXISTS {} WITH (FORCE)").format(sql.Identifier(self.__clone)),
+                    sql.SQL("CREATE DATABASE {} TEMPLATE {}").format(sql.Identifier(self.__clone),
+                                                                    sql.Identifier(_templateName())))
+        self.__schema = Connector.getSchema()
+        Connector.configureSchema(None)
+        Connector.configureConnection(database=self.__clone)
+        Solution._evict()
+        Solution._bump()
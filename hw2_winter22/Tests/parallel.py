@@ -0,0 +1,122 @@
+import argparse
+import glob
+import io
+import multiprocessing
+import os
+import queue
+import sys
+import time
+import traceback
+import unittest
+
+import Solution
+import Utility.DBConnector as Connector
+from Tests import abstractTest
+
+'''
+    Runs the test classes in parallel worker processes against one database.
+    Every worker works in its own schema (worker_0, worker_1, ...), created from the same Tables / Views metadata
+    by the first createTables, so the tests of different workers never see each other's tables.
+    Run from the project root, e.g.:
+        python -m Tests.parallel
+        python -m Tests.parallel --workers 4 Tests.SimpleTest Tests.BulkTest
+'''
+
+
+def _classes(suite, found):
+    for test in suite:
+        if isinstance(test, unittest.TestSuite):
+            _classes(test, found)
+        else:
+            found.setdefault(type(test), []).append(test.id())
+    return found
+
+
+# test classes are kept together (setUpClass, class attributes), the biggest classes are placed first
+def _assign(classes, workers) -> list:
+    shares = [[] for _ in range(workers)]
+    for cls, ids in sorted(classes.items(), key=lambda item: -len(item[1])):
+        min(shares, key=len).extend(ids)
+    return [share for share in shares if share]
+
+
+# a report is (position, tests run, failures, errors, skipped, output)
+def _work(position, ids, results):
+    try:
+        Connector.configureSchema("worker_" + str(position))
+        # rows left behind by an interrupted run would break the rolled back tests
+        Solution.createTables()
+        Solution.clearTables()
+        stream = io.StringIO()
+        result = unittest.TextTestRunner(stream=stream, verbosity=1).run(
+            unittest.defaultTestLoader.loadTestsFromNames(ids))
+        results.put((position, result.testsRun, len(result.failures), len(result.errors), len(result.skipped),
+                     stream.getvalue()))
+    except BaseException:
+        results.put((position, 0, 0, 1, 0, traceback.format_exc()))
+
+
+# waits for a report of every worker; a worker that died without one (killed, out of memory) is reported as an error
+def _collect(processes, results) -> list:
+    reports = {}
+    while len(reports) < len(processes):
+        # a worker that was dead before the wait had its report in the queue during all of it, if it sent one
+        dead = [position for position, process in enumerate(processes) if process.exitcode is not None]
+        try:
+            report = results.get(timeout=1)
+            reports[report[0]] = report
+        except queue.Empty:
+            for position in dead:
+                if position not in reports:
+                    reports[position] = (position, 0, 0, 1, 0, "exited with code %d without a report\n"
+                                         % processes[position].exitcode)
+    return [reports[position] for position in sorted(reports)]
+
+
+def run(names=None, workers=None) -> bool:
+    """
+    :param names: test modules / classes / methods as unittest names, defaults to every Tests/*Test.py
+    :param workers: number of processes, defaults to the number of CPUs
+    :return: whether every test passed
+    """
+    if not names:
+        names = ["Tests." + os.path.basename(path)[:-3] for path in sorted(glob.glob(os.path.join("Tests", "*Test.py")))]
+    classes = _classes(unittest.defaultTestLoader.loadTestsFromNames(names), {})
+
+    # clones are taken from the template by several workers at once, nobody may be connected to it then
+    if any(getattr(cls, "isolation", None) == abstractTest.TEMPLATE for cls in classes):
+        abstractTest.buildTemplate()
+
+    start = time.perf_counter()
+    context = multiprocessing.get_context("fork")
+    results = context.Queue()
+    processes = [context.Process(target=_work, args=(position, ids, results))
+                 for position, ids in enumerate(_assign(classes, workers or os.cpu_count()))]
+    for process in processes:
+        process.start()
+    reports = _collect(processes, results)
+    for process in processes:
+        process.join()
+
+    testsRun = failures = errors = skipped = 0
+    for position, workerRun, workerFailures, workerErrors, workerSkipped, output in reports:
+        testsRun, failures, errors, skipped = (testsRun + workerRun, failures + workerFailures,
+                                               errors + workerErrors, skipped + workerSkipped)
+        if workerFailures or workerErrors:
+            print("worker_" + str(position) + ":\n" + output)
+
+    print("Ran %d tests in %d workers in %.3fs: %d failures, %d errors, %d skipped"
+          % (testsRun, len(processes), time.perf_counter() - start, failures, errors, skipped))
+    return failures == 0 and errors == 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("names", nargs="*", help="unittest names, defaults to every Tests/*Test.py")
+    parser.add_argument("--workers", type=int, default=None, help="defaults to the number of CPUs")
+    args = parser.parse_args()
+    sys.exit(0 if run(args.names, args.workers) else 1)
+
+
+if __name__ == '__main__':
+    main()
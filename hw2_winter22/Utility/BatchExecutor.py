@@ -0,0 +1,83 @@
+import collections
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+
+import Utility.DBConnector as Connector
+
+# the outcome of one call: its return value, or the exception it raised (TimeoutError if it ran out of time)
+CallResult = collections.namedtuple("CallResult", ["value", "error", "seconds"])
+
+# results are in the order of the calls, callSeconds is what running them one after the other would have cost
+BatchReport = collections.namedtuple("BatchReport", ["results", "wallSeconds", "callSeconds", "slowestSeconds"])
+
+
+class BatchExecutor:
+    """
+    Runs independent Solution calls (or any blocking calls) in parallel threads.
+
+    Every call borrows its own pooled connection, so the default number of threads is the connection pool's
+    maxSize. Calls run outside the caller's Solution.transaction() scope, since that scope belongs to the
+    caller's thread.
+
+    :param workers: number of threads, defaults to the connection pool's maxSize
+    :param timeout: default seconds a call may take, counted from the start of the batch. A call that is late
+                    is reported with a TimeoutError; it still finishes in the background
+    """
+
+    def __init__(self, workers=None, timeout=None):
+        self.workers = workers if workers is not None else Connector.getPool().maxSize
+        self.timeout = timeout
+        self.__executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="BatchExecutor")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, excType, excValue, traceback):
+        self.shutdown()
+
+    def shutdown(self, wait=True):
+        self.__executor.shutdown(wait=wait)
+
+    def run(self, calls, timeout=None) -> BatchReport:
+        """
+        :param calls: (function, arg1, arg2, ...) tuples, e.g. [(Solution.popularTeams,), (Solution.mostGoalsForTeam, 1)]
+        :param timeout: seconds for every call of this batch, overrides the executor's timeout. A call may also be
+                        a dict with "call" and "timeout" keys to get its own timeout
+        """
+        start = time.monotonic()
+        submitted = []
+        for call in calls:
+            callTimeout = timeout if timeout is not None else self.timeout
+            if isinstance(call, dict):
+                callTimeout = call.get("timeout", callTimeout)
+                call = call["call"]
+            function, args = call[0], call[1:]
+            submitted.append((self.__executor.submit(_timed, function, args), callTimeout))
+
+        results = []
+        for future, callTimeout in submitted:
+            remaining = None if callTimeout is None else max(0.0, start + callTimeout - time.monotonic())
+            try:
+                results.append(future.result(remaining))
+            except TimeoutError as e:
+                results.append(CallResult(None, e, time.monotonic() - start))
+
+        wallSeconds = time.monotonic() - start
+        seconds = [result.seconds for result in results]
+        return BatchReport(results, wallSeconds, sum(seconds), max(seconds, default=0.0))
+
+    # run the same function once per argument tuple and return just the values, raising the first error
+    def map(self, function, argsList, timeout=None) -> list:
+        report = self.run([(function,) + tuple(args) for args in argsList], timeout)
+        for result in report.results:
+            if result.error is not None:
+                raise result.error
+        return [result.value for result in report.results]
+
+
+def _timed(function, args) -> CallResult:
+    start = time.monotonic()
+    try:
+        return CallResult(function(*args), None, time.monotonic() - start)
+    except Exception as e:
+        return CallResult(None, e, time.monotonic() - start)
@@ -0,0 +1,79 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class LRUCache:
+    """
+    A thread-safe least recently used cache.
+
+    :param maxSize: number of entries kept, the least recently used entry is evicted beyond it
+    :param ttl: seconds an entry stays valid, None keeps entries until they are evicted or invalidated
+    """
+
+    def __init__(self, maxSize=1024, ttl=None):
+        assert maxSize > 0
+
+        self.maxSize = maxSize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        # bumped by every invalidation, see put
+        self.generation = 0
+
+        self.__entries = OrderedDict()  # key -> (value, stored at), most recently used last
+        self.__lock = threading.Lock()
+
+    def __len__(self):
+        with self.__lock:
+            return len(self.__entries)
+
+    # returns (True, value) on a hit and (False, None) on a miss, so None can be cached as well
+    def get(self, key):
+        with self.__lock:
+            entry = self.__entries.get(key)
+            if entry is not None and self.ttl is not None and time.monotonic() - entry[1] > self.ttl:
+                del self.__entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return False, None
+
+            self.__entries.move_to_end(key)
+            self.hits += 1
+            return True, entry[0]
+
+    def put(self, key, value, generation=None):
+        """
+        :param generation: the generation read before loading value, the value is dropped if something was
+                           invalidated in between since it may already be stale
+        """
+        with self.__lock:
+            if generation is not None and generation != self.generation:
+                return
+            self.__entries[key] = (value, time.monotonic())
+            self.__entries.move_to_end(key)
+            while len(self.__entries) > self.maxSize:
+                self.__entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, *keys):
+        with self.__lock:
+            self.generation += 1
+            for key in keys:
+                self.__entries.pop(key, None)
+
+    def clear(self):
+        with self.__lock:
+            self.generation += 1
+            self.__entries.clear()
+
+    def stats(self) -> dict:
+        with self.__lock:
+            return {"size": len(self.__entries), "hits": self.hits, "misses": self.misses,
+                    "evictions": self.evictions}
+
+    def resetStats(self):
+        with self.__lock:
+            self.hits = self.misses = self.evictions = 0
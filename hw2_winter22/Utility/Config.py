@@ -0,0 +1,71 @@
+import os
+import threading
+from configparser import ConfigParser
+
+from Utility.Exceptions import DatabaseException
+
+# database.ini shipped next to this module, independent of the working directory
+DEFAULT_CONFIG_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "database.ini")
+
+# environment variables that override database.ini values (libpq names)
+ENV_OVERRIDES = {
+    "PGHOST": "host",
+    "PGPORT": "port",
+    "PGDATABASE": "database",
+    "PGUSER": "user",
+    "PGPASSWORD": "password",
+}
+
+_configFile = None
+_cache = {}
+_lock = threading.Lock()
+
+
+# use another database.ini for the rest of the process,
+# pooled connections keep their old parameters until DBConnector.closePool()
+def setConfigFile(filename):
+    global _configFile
+    with _lock:
+        _configFile = filename
+        _cache.clear()
+
+
+# forget the parsed files, the next loadConfig reads them again
+def clearConfigCache():
+    with _lock:
+        _cache.clear()
+
+
+def _resolve(filename):
+    if filename is not None:
+        return os.path.abspath(filename)
+    if _configFile is not None:
+        return os.path.abspath(_configFile)
+    if os.environ.get("DATABASE_INI"):
+        return os.path.abspath(os.environ["DATABASE_INI"])
+    return DEFAULT_CONFIG_FILE
+
+
+def loadConfig(filename=None, section="postgresql") -> dict:
+    """
+    :param filename: explicit ini file. Defaults to setConfigFile's file, then $DATABASE_INI, then Utility/database.ini
+    :param section: the ini section holding the connection parameters
+    :return: the connection parameters for psycopg2.connect, parsed once per file and section
+    """
+    with _lock:
+        path = _resolve(filename)
+        key = (path, section)
+        if key not in _cache:
+            parser = ConfigParser()
+            parser.read(path)
+            params = dict(parser.items(section)) if parser.has_section(section) else {}
+
+            for variable, param in ENV_OVERRIDES.items():
+                if os.environ.get(variable):
+                    params[param] = os.environ[variable]
+
+            if not params:
+                raise DatabaseException.database_ini_ERROR("Please modify database.ini file under Utility")
+            _cache[key] = params
+
+        return dict(_cache[key])
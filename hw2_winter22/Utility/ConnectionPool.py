@@ -0,0 +1,177 @@
+import os
+import threading
+import time
+from collections import deque
+
+from psycopg2 import extensions
+
+from Utility.Exceptions import DatabaseException
+
+
+class PooledConnection:
+    # a physical connection owned by a ConnectionPool, with the bookkeeping the pool needs
+    def __init__(self, connection):
+        self.connection = connection
+        self.lastUsed = time.monotonic()
+        # names of the server-side prepared statements that live on this connection
+        self.prepared = set()
+
+
+class ConnectionPool:
+    """
+    A thread-safe pool of psycopg2 connections.
+
+    :param connect: a callable returning a new psycopg2 connection
+    :param minSize: number of connections kept open even when idle
+    :param maxSize: upper bound on connections open at the same time (idle + checked out)
+    :param idleTimeout: seconds after which an idle connection above minSize is closed
+    :param healthCheckAfter: connections idle for longer than this are pinged on checkout
+    :param checkoutTimeout: seconds to wait for a free connection before giving up
+    """
+
+    def __init__(self, connect, minSize=1, maxSize=10, idleTimeout=300.0, healthCheckAfter=5.0,
+                 checkoutTimeout=30.0):
+        assert 0 <= minSize <= maxSize and maxSize > 0
+
+        self.minSize = minSize
+        self.maxSize = maxSize
+        self.idleTimeout = idleTimeout
+        self.healthCheckAfter = healthCheckAfter
+        self.checkoutTimeout = checkoutTimeout
+        self.pid = os.getpid()
+
+        self.__connect = connect
+        self.__idle = deque()  # most recently used connection on the right
+        self.__size = 0  # idle + checked out
+        self.__closed = False
+        self.__cond = threading.Condition()
+
+    # how many connections are open right now
+    def size(self):
+        with self.__cond:
+            return self.__size
+
+    # how many connections are waiting in the pool
+    def idleCount(self):
+        with self.__cond:
+            return len(self.__idle)
+
+    # open connections until minSize are available, errors are left for getConnection to report
+    def warmUp(self):
+        while True:
+            with self.__cond:
+                if self.__closed or self.__size >= self.minSize:
+                    return
+                self.__size += 1
+            try:
+                pooled = PooledConnection(self.__connect())
+            except Exception:
+                self.__forget()
+                return
+            self.release(pooled)
+
+    # check out a healthy connection, blocking while the pool is exhausted
+    def getConnection(self) -> PooledConnection:
+        deadline = time.monotonic() + self.checkoutTimeout
+        with self.__cond:
+            while True:
+                if self.__closed:
+                    raise DatabaseException.ConnectionInvalid("Connection pool is closed")
+                if self.__idle:
+                    pooled = self.__idle.pop()
+                    break
+                if self.__size < self.maxSize:
+                    self.__size += 1
+                    pooled = None
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise DatabaseException.ConnectionInvalid("Connection pool exhausted")
+                self.__cond.wait(remaining)
+
+        # network work happens outside the lock
+        if pooled is not None:
+            if self.__isHealthy(pooled):
+                return pooled
+            # replace the broken connection, its slot stays reserved
+            self.__closeQuietly(pooled)
+
+        try:
+            return PooledConnection(self.__connect())
+        except Exception:
+            self.__forget()
+            raise DatabaseException.ConnectionInvalid("Could not connect to database")
+
+    # give a connection back, whatever it did is rolled back
+    def release(self, pooled: PooledConnection):
+        connection = pooled.connection
+        if not connection.closed and \
+                connection.get_transaction_status() != extensions.TRANSACTION_STATUS_IDLE:
+            try:
+                connection.rollback()
+            except Exception:
+                self.__closeQuietly(pooled)
+
+        expired = []
+        with self.__cond:
+            if connection.closed or self.__closed:
+                self.__size -= 1
+                expired.append(pooled)
+            else:
+                pooled.lastUsed = time.monotonic()
+                self.__idle.append(pooled)
+            expired += self.__reapIdle()
+            self.__cond.notify()
+
+        for idlePooled in expired:
+            self.__closeQuietly(idlePooled)
+
+    # close every idle connection, checked out connections are closed when they are released
+    def closeAll(self):
+        with self.__cond:
+            self.__closed = True
+            idle = list(self.__idle)
+            self.__idle.clear()
+            self.__size -= len(idle)
+            self.__cond.notify_all()
+
+        for pooled in idle:
+            self.__closeQuietly(pooled)
+
+    def __isHealthy(self, pooled: PooledConnection) -> bool:
+        connection = pooled.connection
+        if connection.closed or connection.get_transaction_status() != extensions.TRANSACTION_STATUS_IDLE:
+            return False
+
+        if time.monotonic() - pooled.lastUsed < self.healthCheckAfter:
+            return True
+
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            connection.rollback()
+            return True
+        except Exception:
+            return False
+
+    # must be called with the lock held, returns the connections to close
+    def __reapIdle(self):
+        expired = []
+        now = time.monotonic()
+        while self.__size > self.minSize and self.__idle and now - self.__idle[0].lastUsed > self.idleTimeout:
+            expired.append(self.__idle.popleft())
+            self.__size -= 1
+        return expired
+
+    # drop a reserved slot that never got a live connection
+    def __forget(self):
+        with self.__cond:
+            self.__size -= 1
+            self.__cond.notify()
+
+    @staticmethod
+    def __closeQuietly(pooled: PooledConnection):
+        try:
+            pooled.connection.close()
+        except Exception:
+            pass
@@ -1,9 +1,18 @@
+import abc
 import psycopg2
-from psycopg2 import errors, sql
-from configparser import ConfigParser
+from psycopg2 import extras, sql
 from Utility.Exceptions import DatabaseException
+from Utility.ConnectionPool import ConnectionPool
+from Utility.Config import loadConfig
+import Utility.Instrumentation as Instrumentation
+import collections
+import itertools
 import os
-from typing import Union
+import threading
+import time
+from collections.abc import Mapping
+from contextlib import contextmanager
+from typing import List, Union
 
 
 class ResultSetDict(dict):
@@ -13,17 +22,137 @@ class ResultSetDict(dict):
         return super().__getitem__(item.lower())
 
 
-class ResultSet:
+# a read-only view of one result row: row[index], case-insensitive row["name"],
+# and iterating it gives the column names, like a dict keyed by column
+class Row(Mapping):
+    __slots__ = ("values",)
+    # set once per column header by rowType()
+    _names = ()
+    _index = {}
+
+    def __init__(self, values: tuple):
+        self.values = values
+
+    def __getitem__(self, item):
+        if type(item) is int:
+            return self.values[item]
+        if type(item) is not str:
+            return None
+        index = self._index.get(item)
+        if index is None:
+            index = self._index[item.lower()]
+        return self.values[index]
+
+    def __iter__(self):
+        return iter(self._names)
+
+    def __len__(self):
+        return len(self._names)
+
+    def __repr__(self):
+        return "Row(" + ", ".join(name + "=" + repr(val) for name, val in zip(self._names, self.values)) + ")"
+
+
+_rowTypes = {}
+
+
+# the Row subclass for a column header, built once and shared by every row with that header
+def rowType(cols_header) -> type:
+    key = tuple(cols_header)
+    cls = _rowTypes.get(key)
+    if cls is None:
+        index = {}
+        for position, name in enumerate(key):
+            index[name] = position
+            index[name.lower()] = position
+        cls = type("Row", (Row,), {"__slots__": (), "_names": key, "_index": index})
+        _rowTypes[key] = cls
+    return cls
+
+
+# numpy dtypes for PostgreSQL type OIDs (bool, int8, int2, int4, float4, float8, numeric), anything else is object
+_NUMPY_TYPES = {16: "bool", 20: "int64", 21: "int64", 23: "int64", 700: "float64", 701: "float64", 1700: "float64"}
+
+
+def _importNumpy():
+    try:
+        import numpy
+    except ImportError:
+        raise ImportError("numpy is required for toNumpy() and toRecords(), pip install numpy")
+    return numpy
+
+
+# one typed array from a column's values, NULLs turn int columns into float64 (NaN) and bool columns into object
+def _toArray(numpy, values, typeCode):
+    dtype = _NUMPY_TYPES.get(typeCode, "object")
+    if dtype in ("int64", "bool") and None in values:
+        dtype = "float64" if dtype == "int64" else "object"
+    return numpy.array(values, dtype=dtype)
+
+
+# rows per batch when a ResultSet's rows are exported column-wise
+EXPORT_BATCH_SIZE = 10000
+
+
+# column-wise export shared by ResultSet and StreamingResultSet, built batch by batch without per-row objects
+class _ColumnExport(abc.ABC):
+    cols_header = []
+    cols_types = []
+
+    # lists of row tuples, implemented by the result set
+    @abc.abstractmethod
+    def _batches(self):
+        pass
+
+    # {column name: list of values}
+    def toColumns(self) -> dict:
+        columns = [[] for _ in self.cols_header]
+        for batch in self._batches():
+            for column, values in zip(columns, zip(*batch)):
+                column.extend(values)
+        return dict(zip(self.cols_header, columns))
+
+    # {column name: numpy array}, int64 / float64 / bool for numeric columns and object for the rest
+    def toNumpy(self) -> dict:
+        numpy = _importNumpy()
+        chunks = [[] for _ in self.cols_header]
+        for batch in self._batches():
+            for chunk, values, typeCode in zip(chunks, zip(*batch), self.cols_types):
+                chunk.append(_toArray(numpy, values, typeCode))
+
+        columns = {}
+        for name, chunk, typeCode in zip(self.cols_header, chunks, self.cols_types):
+            columns[name] = numpy.concatenate(chunk) if chunk else _toArray(numpy, (), typeCode)
+        return columns
+
+    # a numpy structured array with one field per column
+    def toRecords(self):
+        numpy = _importNumpy()
+        columns = self.toNumpy()
+        size = len(next(iter(columns.values()))) if columns else 0
+        records = numpy.empty(size, dtype=[(name, column.dtype) for name, column in columns.items()])
+        for name, column in columns.items():
+            records[name] = column
+        return records
+
+
+class ResultSet(_ColumnExport):
     # constructor
     def __init__(self, description=None, results=None):
         self.rows = []
         self.cols_header = []
+        self.cols_types = []
         self.cols = ResultSetDict()
         self.__fromQuery(description, results)
+        self.__rowType = rowType(self.cols_header)
 
     def __getitem__(self, row):
         return self.__getRow(row)
 
+    # iterate the rows, each as a Row
+    def __iter__(self):
+        return map(self.__rowType, self.rows)
+
     # so you can use print(ResultSet)
     def __str__(self):
         string = ""
@@ -48,82 +177,351 @@ class ResultSet:
         if len(self.rows) <= row:
             print('Invalid row ' + str(row))
             return ResultSetDict()
-        row_to_return = ResultSetDict()
-        for val, col in zip(self.rows[row], self.cols_header):
-            row_to_return[col] = val
-        return row_to_return
+        return self.__rowType(self.rows[row])
+
+    def _batches(self):
+        for start in range(0, len(self.rows), EXPORT_BATCH_SIZE):
+            yield self.rows[start:start + EXPORT_BATCH_SIZE]
 
     def __fromQuery(self, description, results: list):
+        if description is not None:
+            self.cols_header = [d.name for d in description]
+            self.cols_types = [d.type_code for d in description]
         if results is None or len(results) == 0:  # no results
             self.cols = ResultSetDict()
         else:
-            self.rows = results.copy()
-            self.cols_header = [d.name for d in description]
+            self.rows = results
             self.cols = ResultSetDict()
             for col, index in zip(self.cols_header, range(len(results[0]))):
                 self.cols[col] = index
 
 
+# the rows of a SELECT, read lazily from a server-side cursor fetchSize rows per round trip
+# iterate it once; it stays readable until its DBConnector commits or is closed
+class StreamingResultSet(_ColumnExport):
+    # constructor, firstBatch is the already fetched first batch (it also tells the column names)
+    def __init__(self, cursor, fetchSize, firstBatch):
+        self.fetchSize = fetchSize
+        self.rowsFetched = len(firstBatch)
+        description = cursor.description if cursor.description is not None else []
+        self.cols_header = [d.name for d in description]
+        self.cols_types = [d.type_code for d in description]
+        self.cols = ResultSetDict()
+        for index, col in enumerate(self.cols_header):
+            self.cols[col] = index
+        self.__rowType = rowType(self.cols_header)
+        self.__cursor = cursor
+        self.__firstBatch = firstBatch
+
+    # yields lists of at most fetchSize row tuples
+    def batches(self):
+        try:
+            batch = self.__firstBatch
+            self.__firstBatch = []
+            while batch:
+                yield batch
+                if len(batch) < self.fetchSize:
+                    return
+                started = time.perf_counter() if Instrumentation.enabled else None
+                with _translateErrors():
+                    batch = self.__cursor.fetchmany(self.fetchSize)
+                if started is not None:
+                    Instrumentation.record("fetch", time.perf_counter() - started, rows=len(batch))
+                self.rowsFetched += len(batch)
+        finally:
+            self.close()
+
+    def _batches(self):
+        return self.batches()
+
+    # yields each row as a Row, like ResultSet[index] does
+    def __iter__(self):
+        rowType = self.__rowType
+        for batch in self.batches():
+            yield from map(rowType, batch)
+
+    # release the server-side cursor, done automatically once the rows are exhausted
+    def close(self):
+        try:
+            self.__cursor.close()
+        except Exception:
+            pass
+
+
+# unique names for server-side cursors
+_cursorIds = itertools.count()
+
+
+# integrity errors by SQLSTATE
+_ERRORS = {
+    "23502": DatabaseException.NOT_NULL_VIOLATION,
+    "23503": DatabaseException.FOREIGN_KEY_VIOLATION,
+    "23505": DatabaseException.UNIQUE_VIOLATION,
+    "23514": DatabaseException.CHECK_VIOLATION,
+}
+
+
+# maps integrity errors to the matching DatabaseException, other errors pass through;
+# a plain class rather than @contextmanager, it wraps every execute
+class _ErrorTranslator:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, excType, excValue, traceback):
+        if isinstance(excValue, psycopg2.Error) and excValue.pgcode in _ERRORS:
+            raise _ERRORS[excValue.pgcode](_ERRORS[excValue.pgcode].__name__)
+        return False
+
+
+_errorTranslator = _ErrorTranslator()
+
+
+def _translateErrors() -> _ErrorTranslator:
+    return _errorTranslator
+
+
+# the DatabaseException for an error reported by SQLSTATE, UNKNOWN_ERROR when it is not an integrity error
+def _databaseException(pgcode: str, message: str) -> DatabaseException:
+    if pgcode in _ERRORS:
+        error = _ERRORS[pgcode](_ERRORS[pgcode].__name__)
+    else:
+        error = DatabaseException.UNKNOWN_ERROR(message)
+    error.pgcode = pgcode
+    return error
+
+
+# "EXECUTE name (%s, ...)" by (statement name, parameter count), built once per statement
+_executeTexts = {}
+
+
+# the outcome of one executeMany statement, error is None when it succeeded
+StatementResult = collections.namedtuple("StatementResult", ["rowCount", "error"])
+
+# executes each statement of an array in its own subtransaction and reports its row count or error;
+# with atomic the first error is raised instead. A session-local (pg_temp) function, created once per connection
+_EXECUTE_MANY = "pg_temp.executeMany"
+_CREATE_EXECUTE_MANY = (
+    "CREATE OR REPLACE FUNCTION pg_temp.executeMany(statements text[], atomic boolean) "
+    "RETURNS TABLE (rowCount bigint, errorCode text, errorMessage text) AS $$ "
+    "BEGIN "
+    "FOR i IN 1 .. coalesce(array_length(statements, 1), 0) LOOP "
+    "rowCount := NULL; errorCode := NULL; errorMessage := NULL; "
+    "BEGIN "
+    "EXECUTE statements[i]; "
+    "GET DIAGNOSTICS rowCount = ROW_COUNT; "
+    "EXCEPTION WHEN OTHERS THEN "
+    "IF atomic THEN RAISE USING ERRCODE = SQLSTATE, MESSAGE = 'statement ' || i || ': ' || SQLERRM; END IF; "
+    "errorCode := SQLSTATE; errorMessage := SQLERRM; "
+    "END; "
+    "RETURN NEXT; "
+    "END LOOP; "
+    "END $$ LANGUAGE plpgsql")
+
+
+# process-wide connection pool, created lazily by getPool()
+_pool = None
+_poolSettings = {}
+# psycopg2.connect keywords that override database.ini, see configureConnection
+_connectionSettings = {}
+# the schema connections work in (their search_path), None for the database's default, see configureSchema
+_schema = None
+_poolLock = threading.Lock()
+# pools inherited through fork(), kept referenced so their sockets are never closed from the child
+_inheritedPools = []
+
+
+# change the pool settings (see ConnectionPool for the accepted keywords), the current pool is closed
+def configurePool(**settings):
+    global _pool
+    with _poolLock:
+        _poolSettings.update(settings)
+        if _pool is not None and _pool.pid == os.getpid():
+            _pool.closeAll()
+        _pool = None
+
+
+def getPool() -> ConnectionPool:
+    global _pool
+    with _poolLock:
+        if _pool is not None and _pool.pid != os.getpid():
+            _inheritedPools.append(_pool)
+            _pool = None
+        if _pool is None:
+            _pool = ConnectionPool(DBConnector._connect, **_poolSettings)
+            _pool.warmUp()
+        return _pool
+
+
+# close the pool's connections, the next DBConnector opens a fresh pool
+def closePool():
+    configurePool()
+
+
+# connect with these psycopg2.connect keywords on top of database.ini (e.g. database="other"), None removes one;
+# the current pool is closed
+def configureConnection(**settings):
+    with _poolLock:
+        for key, value in settings.items():
+            if value is None:
+                _connectionSettings.pop(key, None)
+            else:
+                _connectionSettings[key] = value
+    closePool()
+
+
+# database.ini's connection parameters with configureConnection's overrides
+def connectionParams() -> dict:
+    params = loadConfig()
+    params.update(_connectionSettings)
+    return params
+
+
+# work in this schema from now on (it becomes the search_path of every connection), None for the default;
+# Solution.createTables creates the schema. The current pool is closed
+def configureSchema(schema=None):
+    global _schema
+    with _poolLock:
+        _schema = schema
+    closePool()
+
+
+def getSchema():
+    return _schema
+
+
 class DBConnector:
-    # constructor
+    # constructor, borrows a connection from the process-wide pool
     def __init__(self):
+        self.__pool = None
+        self.__pooled = None
+        self.__depth = 0  # how many transaction() scopes are open
+        # session objects created in the open transaction, known to the pooled connection once it commits
+        self.__uncommitted = set()
+        self.connection = None
+        self.cursor = None
+        started = time.perf_counter() if Instrumentation.enabled else None
         try:
-            # Obtain the configuration parameters
-            params = DBConnector.__config()
-            self.connection = psycopg2.connect(**params)
-            self.connection.autocommit = False
+            self.__pool = getPool()
+            self.__pooled = self.__pool.getConnection()
+            self.connection = self.__pooled.connection
             self.cursor = self.connection.cursor()
         except Exception as e:
-            self.connection = None
-            self.cursor = None
+            self.close()
             raise DatabaseException.ConnectionInvalid("Could not connect to database")
+        if started is not None:
+            Instrumentation.record("connect", time.perf_counter() - started, roundTrips=0)
+
+    # open a new physical connection, used by the pool
+    @staticmethod
+    def _connect():
+        # Obtain the configuration parameters, database.ini is parsed once per process
+        params = connectionParams()
+        if _schema is not None:
+            params["options"] = (params.get("options", "") + " -c search_path=" + _schema).strip()
+        connection = psycopg2.connect(**params)
+        connection.autocommit = False
+        return connection
 
-    # close connection
+    # close connection, i.e. give it back to the pool
     def close(self):
         if self.cursor is not None:
             self.cursor.close()
-        if self.connection is not None:
-            self.connection.close()
+        if self.__pooled is not None:
+            self.__pool.release(self.__pooled)
+        self.__pooled = None
+        self.connection = None
+        self.cursor = None
 
     # commit connection's changes
     def commit(self):
         if self.connection is not None:
+            started = time.perf_counter() if Instrumentation.enabled else None
             try:
                 self.connection.commit()
             except Exception:
                 raise DatabaseException.ConnectionInvalid("Could not commit changes")
+            self.__pooled.prepared.update(self.__uncommitted)
+            self.__uncommitted.clear()
+            if started is not None:
+                Instrumentation.record("commit", time.perf_counter() - started)
 
     # rollback connection's changes
     def rollback(self):
         if self.connection is not None:
+            started = time.perf_counter() if Instrumentation.enabled else None
+            self.__uncommitted.clear()
             try:
                 self.connection.rollback()
             except Exception:
                 raise DatabaseException.ConnectionInvalid("Could not rollback changes")
+            if started is not None:
+                Instrumentation.record("rollback", time.perf_counter() - started)
+
+    # is a transaction() scope open?
+    def inTransaction(self):
+        return self.__depth > 0
+
+    # groups everything executed inside the scope into one commit, rolled back if the scope raises
+    # nested scopes become savepoints, so an inner failure only undoes the inner scope
+    @contextmanager
+    def transaction(self):
+        if self.connection is None:
+            raise DatabaseException.ConnectionInvalid("Connection Invalid")
+
+        depth = self.__depth
+        savepoint = "transaction_" + str(depth)
+        if depth > 0:
+            self.savepoint(savepoint)
+        self.__depth += 1
+        try:
+            yield self
+        except BaseException:
+            self.__depth = depth
+            if depth > 0:
+                self.rollbackToSavepoint(savepoint)
+                self.releaseSavepoint(savepoint)
+            else:
+                self.rollback()
+            raise
+        self.__depth = depth
+        if depth > 0:
+            self.releaseSavepoint(savepoint)
+        else:
+            self.commit()
 
     # executes the query, if it is SELECT you may ask to print the results with printSchema
+    # params are bound to %s placeholders in the query
+    # the query is committed right away unless a transaction() scope is open
     # returns the number of rows effected and a ResultSet (for SELECT)
-    def execute(self, query: Union[str, sql.Composed], printSchema=False) -> (int, ResultSet):
+    # with stream=True the SELECT is read through a StreamingResultSet instead, fetchSize rows at a time,
+    # and the row count is -1 since it is not known up front
+    def execute(self, query: Union[str, sql.Composed], printSchema=False, params=None, stream=False,
+                fetchSize=2000) -> (int, ResultSet):
         if self.connection is None:
             raise DatabaseException.ConnectionInvalid("Connection Invalid")
 
+        if stream:
+            return -1, self.__executeStreaming(query, params, fetchSize)
+
         # try execute the query
-        try:
-            self.cursor.execute(query)
+        started = time.perf_counter() if Instrumentation.enabled else None
+        with _translateErrors():
+            self.cursor.execute(query, params)
             row_effected = max(self.cursor.rowcount, 0)
-            self.commit()
-        except errors.lookup("23502"):
-            raise DatabaseException.NOT_NULL_VIOLATION("NOT_NULL_VIOLATION")
-        except errors.lookup("23503"):
-            raise DatabaseException.FOREIGN_KEY_VIOLATION("FOREIGN_KEY_VIOLATION")
-        except errors.lookup("23505"):
-            raise DatabaseException.UNIQUE_VIOLATION("UNIQUE_VIOLATION")
-        except errors.lookup("23514"):
-            raise DatabaseException.CHECK_VIOLATION("CHECK_VIOLATION")
+            if started is not None:
+                slow = Instrumentation.record("execute", time.perf_counter() - started, rows=row_effected,
+                                              query=query, params=params)
+                if slow is not None and Instrumentation.explainSlow:
+                    slow["plan"] = self.__explain(query, params)
+            if self.__depth == 0:
+                self.commit()
 
         # get entries in case of SELECT
         if self.cursor.description is not None:
+            started = time.perf_counter() if Instrumentation.enabled else None
             entries = ResultSet(self.cursor.description, self.cursor.fetchall())
+            if started is not None:
+                Instrumentation.record("fetch", time.perf_counter() - started, roundTrips=0)
         else:
             entries = ResultSet()
 
@@ -133,25 +531,131 @@ class DBConnector:
 
         return row_effected, entries
 
-    # grant credentials
-    @staticmethod
-    def __config(filename=os.path.join(os.path.join(os.getcwd(), "Utility"), 'database.ini'),
-                 section='postgresql'):
-        # create a parser
-        parser = ConfigParser()
-        # read config file
-        parser.read(filename)
-
-        # get section
-        db = {}
-        if parser.has_section(section):
-            params = parser.items(section)
-            for param in params:
-                db[param[0]] = param[1]
-        else:
-            # file not found
-            db = DBConnector.__config(
-                filename=os.path.join(os.path.join(os.path.dirname(os.getcwd()), 'Utility'), 'database.ini'))
-            if db is None:
-                raise DatabaseException.database_ini_ERROR("Please modify database.ini file under Utility")
-        return db
+    # the EXPLAIN (ANALYZE, BUFFERS) plan of a query that just ran, ANALYZE runs it again so it is rolled back
+    # (a repeated write may fail, e.g. on a unique key, then the error is returned instead of the plan)
+    def __explain(self, query, params) -> list:
+        prefix = "EXPLAIN (ANALYZE, BUFFERS) "
+        explain = sql.SQL(prefix) + query if isinstance(query, sql.Composable) else prefix + query
+        cursor = self.connection.cursor()
+        try:
+            cursor.execute("SAVEPOINT explain")
+            try:
+                cursor.execute(explain, params)
+                return [row[0] for row in cursor.fetchall()]
+            except Exception as e:
+                return ["EXPLAIN failed: " + str(e).strip()]
+            finally:
+                cursor.execute("ROLLBACK TO SAVEPOINT explain")
+                cursor.execute("RELEASE SAVEPOINT explain")
+        finally:
+            cursor.close()
+
+    # declares a server-side cursor for the query, nothing is committed so that the cursor stays open
+    def __executeStreaming(self, query, params, fetchSize) -> StreamingResultSet:
+        cursor = self.connection.cursor(name="stream_" + str(next(_cursorIds)))
+        started = time.perf_counter() if Instrumentation.enabled else None
+        try:
+            with _translateErrors():
+                cursor.execute(query, params)
+                firstBatch = cursor.fetchmany(fetchSize)
+        except BaseException:
+            cursor.close()
+            raise
+        if started is not None:
+            # a named cursor sends DECLARE and the first FETCH together
+            Instrumentation.record("execute", time.perf_counter() - started, rows=len(firstBatch), query=query,
+                                   params=params)
+        return StreamingResultSet(cursor, fetchSize, firstBatch)
+
+    # executes a server-side prepared statement, query uses $1, $2, ... placeholders
+    # the statement is PREPAREd once per pooled connection and EXECUTEd with params afterwards
+    def executePrepared(self, name: str, query: str, params=(), printSchema=False) -> (int, ResultSet):
+        if self.connection is None:
+            raise DatabaseException.ConnectionInvalid("Connection Invalid")
+
+        if name not in self.__pooled.prepared:
+            started = time.perf_counter() if Instrumentation.enabled else None
+            self.cursor.execute("PREPARE " + name + " AS " + query)
+            self.__pooled.prepared.add(name)
+            if started is not None:
+                Instrumentation.record("prepare", time.perf_counter() - started)
+
+        key = (name, len(params))
+        execute = _executeTexts.get(key)
+        if execute is None:
+            execute = "EXECUTE " + name
+            if params:
+                execute += " (" + ", ".join(["%s"] * len(params)) + ")"
+            _executeTexts[key] = execute
+        return self.execute(execute, printSchema=printSchema, params=params)
+
+    # inserts many rows with a single INSERT ... VALUES %s query, pageSize rows per statement
+    # nothing is committed, returns the number of rows effected
+    def executeValues(self, query: Union[str, sql.Composed], rows, pageSize=1000) -> int:
+        if self.connection is None:
+            raise DatabaseException.ConnectionInvalid("Connection Invalid")
+
+        row_effected = 0
+        started = time.perf_counter() if Instrumentation.enabled else None
+        with _translateErrors():
+            for start in range(0, len(rows), pageSize):
+                extras.execute_values(self.cursor, query, rows[start:start + pageSize], page_size=pageSize)
+                row_effected += max(self.cursor.rowcount, 0)
+        if started is not None:
+            Instrumentation.record("execute", time.perf_counter() - started, rows=row_effected,
+                                   roundTrips=(len(rows) + pageSize - 1) // pageSize, query=query)
+        return row_effected
+
+    # runs all queries in a single round trip and returns a StatementResult per query, in order
+    # each query runs under its own savepoint, so a failing query reports its DatabaseException and the others
+    # are kept; with atomic the first failure is raised instead, and nothing is kept
+    # queries cannot take params (compose them with sql.Literal) and the rows of a SELECT are not returned
+    # committed right away unless a transaction() scope is open
+    def executeMany(self, queries: List[Union[str, sql.Composed]], atomic=False) -> List[StatementResult]:
+        if self.connection is None:
+            raise DatabaseException.ConnectionInvalid("Connection Invalid")
+        if not queries:
+            return []
+
+        statements = [query.as_string(self.connection) if isinstance(query, sql.Composable) else query
+                      for query in queries]
+        call = "SELECT * FROM " + _EXECUTE_MANY + "(%s::text[], %s)"
+        if _EXECUTE_MANY not in self.__pooled.prepared:
+            call = _CREATE_EXECUTE_MANY + "; " + call
+            self.__uncommitted.add(_EXECUTE_MANY)
+
+        started = time.perf_counter() if Instrumentation.enabled else None
+        try:
+            with _translateErrors():
+                self.cursor.execute(call, (statements, atomic))
+                rows = self.cursor.fetchall()
+        except BaseException:
+            if self.__depth == 0:
+                self.rollback()
+            raise
+        if started is not None:
+            Instrumentation.record("execute", time.perf_counter() - started,
+                                   rows=sum(rowCount or 0 for rowCount, code, message in rows), query=call)
+        if self.__depth == 0:
+            self.commit()
+
+        return [StatementResult(rowCount, None if code is None else _databaseException(code, message))
+                for rowCount, code, message in rows]
+
+    # savepoints inside the current (uncommitted) transaction
+    def savepoint(self, name: str):
+        self.__savepointCommand("SAVEPOINT " + name)
+
+    def rollbackToSavepoint(self, name: str):
+        # might undo what was created since the savepoint, so it is created again next time
+        self.__uncommitted.clear()
+        self.__savepointCommand("ROLLBACK TO SAVEPOINT " + name)
+
+    def releaseSavepoint(self, name: str):
+        self.__savepointCommand("RELEASE SAVEPOINT " + name)
+
+    def __savepointCommand(self, command: str):
+        started = time.perf_counter() if Instrumentation.enabled else None
+        self.cursor.execute(command)
+        if started is not None:
+            Instrumentation.record("savepoint", time.perf_counter() - started)
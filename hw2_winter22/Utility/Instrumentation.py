@@ -0,0 +1,132 @@
+import json
+import sys
+import threading
+import time
+from collections import deque
+
+'''
+    Timings of the database work done by DBConnector, grouped by the Solution function that asked for it.
+    Off by default: DBConnector only checks the module's enabled flag, nothing is timed or recorded.
+
+    Phases: connect (pool checkout), prepare, execute, fetch, commit, rollback and savepoint.
+    Each phase keeps a count, total/min/max and a latency histogram, plus the round trips and rows of its tag.
+'''
+
+enabled = False
+# execute phases at least this slow (seconds) go to the slow query log, None disables the log
+slowThreshold = None
+# re-run slow queries as EXPLAIN (ANALYZE, BUFFERS) inside a rolled back scope and keep the plan
+explainSlow = False
+# functions of these modules tag the work they cause, the outermost one wins (e.g. createTables, not sendQuery)
+tagModules = {"Solution"}
+
+# upper bounds (ms) of the histogram buckets, the last bucket is unbounded
+BUCKETS_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+
+_lock = threading.Lock()
+_tags = {}
+_slowLog = deque(maxlen=1000)
+
+
+def enable(slowThresholdSeconds=None, explain=False, slowLogSize=1000):
+    global enabled, slowThreshold, explainSlow, _slowLog
+    with _lock:
+        slowThreshold = slowThresholdSeconds
+        explainSlow = explain
+        if _slowLog.maxlen != slowLogSize:
+            _slowLog = deque(_slowLog, maxlen=slowLogSize)
+        enabled = True
+
+
+# stop recording, what was recorded so far is kept until reset()
+def disable():
+    global enabled
+    enabled = False
+
+
+def reset():
+    with _lock:
+        _tags.clear()
+        _slowLog.clear()
+
+
+def _caller() -> str:
+    tag = "<direct>"
+    frame = sys._getframe(2)
+    while frame is not None:
+        if frame.f_globals.get("__name__") in tagModules:
+            tag = frame.f_code.co_name
+        frame = frame.f_back
+    return tag
+
+
+def record(phase, seconds, rows=0, roundTrips=1, query=None, params=None):
+    """
+    Adds one timed phase under the calling Solution function.
+    :return: the slow query log entry if this was a slow execute, so the caller can attach a plan; otherwise None
+    """
+    tag = _caller()
+    milliseconds = seconds * 1000
+    bucket = 0
+    while bucket < len(BUCKETS_MS) and milliseconds > BUCKETS_MS[bucket]:
+        bucket += 1
+
+    with _lock:
+        stats = _tags.get(tag)
+        if stats is None:
+            stats = _tags[tag] = {"roundTrips": 0, "rows": 0, "phases": {}}
+        stats["roundTrips"] += roundTrips
+        stats["rows"] += rows
+
+        timing = stats["phases"].get(phase)
+        if timing is None:
+            timing = stats["phases"][phase] = {"count": 0, "totalMs": 0.0, "minMs": milliseconds,
+                                               "maxMs": milliseconds, "histogram": [0] * (len(BUCKETS_MS) + 1)}
+        timing["count"] += 1
+        timing["totalMs"] += milliseconds
+        timing["minMs"] = min(timing["minMs"], milliseconds)
+        timing["maxMs"] = max(timing["maxMs"], milliseconds)
+        timing["histogram"][bucket] += 1
+
+        if phase != "execute" or slowThreshold is None or seconds < slowThreshold:
+            return None
+        entry = {"tag": tag, "at": time.time(), "ms": milliseconds, "rows": rows, "query": str(query),
+                 "params": None if params is None else [str(param) for param in params], "plan": None}
+        _slowLog.append(entry)
+        return entry
+
+
+def stats() -> dict:
+    """
+    :return: {tag: {"roundTrips", "rows", "phases": {phase: {"count", "totalMs", "minMs", "maxMs", "meanMs",
+             "histogram": {"<=1ms": count, ...}}}}}
+    """
+    labels = ["<=" + str(bound) + "ms" for bound in BUCKETS_MS] + [">" + str(BUCKETS_MS[-1]) + "ms"]
+    with _lock:
+        result = {}
+        for tag, stats in _tags.items():
+            phases = {}
+            for phase, timing in stats["phases"].items():
+                phases[phase] = {"count": timing["count"], "totalMs": timing["totalMs"], "minMs": timing["minMs"],
+                                 "maxMs": timing["maxMs"], "meanMs": timing["totalMs"] / timing["count"],
+                                 "histogram": {label: count for label, count in zip(labels, timing["histogram"])
+                                               if count}}
+            result[tag] = {"roundTrips": stats["roundTrips"], "rows": stats["rows"], "phases": phases}
+        return result
+
+
+def slowQueries() -> list:
+    with _lock:
+        return [dict(entry) for entry in _slowLog]
+
+
+def dumpJson(filename=None) -> str:
+    """
+    :param filename: also write the JSON to this file
+    :return: {"stats": stats(), "slowQueries": slowQueries()} as JSON
+    """
+    dump = json.dumps({"stats": stats(), "slowQueries": slowQueries()}, indent=2)
+    if filename is not None:
+        with open(filename, "w") as file:
+            file.write(dump)
+    return dump